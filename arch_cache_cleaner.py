@@ -0,0 +1,5104 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import errno
+import functools
+import marshal
+import os
+import re
+import stat
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import queue
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+DEFAULT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+DEFAULT_DELETE_JOBS = min(8, os.cpu_count() or 1)
+DELETE_OPEN_DIRS = 256
+SIZE_INDEX_VERSION = 1
+CONFIG_CACHE_VERSION = 4
+PASSWD_PATH = Path("/etc/passwd")
+DEFAULT_UID_RANGE = (1000, 60000)
+NOLOGIN_SHELLS = frozenset({"/usr/bin/nologin", "/usr/sbin/nologin", "/sbin/nologin", "/bin/false", "/usr/bin/false"})
+USER_ENV_NAMES = frozenset({"HOME", "USER", "USERNAME"})
+GLOB_MAGIC_RE = re.compile(r"[*?\[]")
+CONFIG_ENV_RE = re.compile(r"\$\{?(\w+)\}?|%(\w+)%")
+SIZE_INDEX_MAX_ENTRIES = 250_000
+SIZE_INDEX_SETTLE_NS = 2_000_000_000
+TEMP_QUEUE_SIZE = 1024
+JOURNAL_VERSION = 1
+JOURNAL_SYNC_RECORDS = 64
+JOURNAL_SYNC_SECONDS = 1.0
+TRASH_DIR_NAME = ".arch-cache-cleaner-trash"
+DEFAULT_BACKGROUND_NICE = 19
+IONICE_CLASSES = {"idle": "3", "best-effort": "2", "none": None}
+PRIVILEGED_REMOVE_SCRIPT = 'rm -rf -- "$@"; for p do if [ -e "$p" ] || [ -L "$p" ]; then printf "%s\\0" "$p"; fi; done; exit 0'
+DUPLICATE_HEAD_BYTES = 64 * 1024
+DUPLICATE_HASH_CHUNK = 1024 * 1024
+DUPLICATE_SERIAL_LIMIT = 64
+DUPLICATE_LIST_LIMIT = 20
+EXPLORE_TOP_K = 500
+HISTORY_VERSION = 1
+DEFAULT_HISTORY_DAYS = 365
+DEFAULT_TRENDS_DAYS = 30
+HISTORY_TIERS = ((7 * 86400, 86400), (90 * 86400, 7 * 86400))
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS paths (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    group_key TEXT NOT NULL,
+    device INTEGER
+);
+CREATE TABLE IF NOT EXISTS samples (
+    path_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    cleaned INTEGER NOT NULL,
+    grown INTEGER NOT NULL,
+    span INTEGER NOT NULL,
+    PRIMARY KEY (path_id, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE TABLE IF NOT EXISTS filesystems (
+    device INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    mount TEXT NOT NULL,
+    free INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (device, ts)
+) WITHOUT ROWID;
+"""
+EXPLORE_BAR_WIDTH = 12
+TEMP_AGE_FIELDS = ("mtime", "atime", "ctime")
+EVICT_AGE_FIELDS = ("atime", "mtime")
+PACMAN_LOCAL_DB = Path("/var/lib/pacman/local")
+ENGINE_PRUNE_TARGETS = {"build_cache": "/build/prune", "images": "/images/prune"}
+ENGINE_PING_TIMEOUT = 3.0
+ENGINE_PRUNE_TIMEOUT = 900.0
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK
+)
+WATCH_SETTLE_SECONDS = 1.0
+DEFAULT_WATCH_COOLDOWN = 300.0
+PACMAN_PACKAGE_RE = re.compile(r"^(?P<name>.+)-(?P<version>[^-]+-[^-]+)-(?P<arch>[^-]+)\.pkg\.tar(?:\.[A-Za-z0-9]+)?$")
+
+ScanResult = tuple[int, list[tuple[int, int, int]], list[str]]
+
+
+@dataclass(frozen=True)
+class EvictPolicy:
+    max_bytes: int | None = None
+    older_than_days: float | None = None
+    by: str = "atime"
+
+
+@dataclass(frozen=True)
+class PacmanPolicy:
+    keep: int = 3
+    installed_only: bool = False
+    cache_dirs: tuple[str, ...] = ("/var/cache/pacman/pkg",)
+
+
+@dataclass(frozen=True)
+class EnginePolicy:
+    sockets: tuple[tuple[str, tuple[str, ...]], ...]
+    prune: tuple[str, ...] = ("build_cache", "images")
+    raw_fallback: bool = True
+
+
+@dataclass(frozen=True)
+class UserAccount:
+    name: str
+    uid: int
+    gid: int
+    home: Path
+
+
+@dataclass(frozen=True)
+class PathPattern:
+    group_key: str
+    source_index: int
+    root: Path
+    parts: tuple[str, ...]
+    dir_only: bool
+
+
+@dataclass(frozen=True)
+class DuplicateFile:
+    path: str
+    device: int
+    inode: int
+    mtime_ns: int
+    links: int
+    uid: int
+    gid: int
+    mode: int
+
+
+@dataclass(frozen=True)
+class DuplicateSet:
+    size: int
+    digest: str
+    files: tuple[DuplicateFile, ...]
+
+    @property
+    def reclaimable(self) -> int:
+        return self.size * (len(self.files) - 1)
+
+
+@dataclass(frozen=True)
+class TempEntry:
+    kind: str
+    path: str
+    name: str
+    parent_fd: int | None
+    fd: int | None = None
+
+
+@dataclass(frozen=True)
+class WatchPolicy:
+    max_bytes: int
+
+
+@dataclass(frozen=True)
+class CacheGroup:
+    title: str
+    prompt: str
+    paths: list[str]
+    evict: EvictPolicy | None = None
+    pacman: PacmanPolicy | None = None
+    watch: WatchPolicy | None = None
+    exclude: list[str] = field(default_factory=list)
+    engine: EnginePolicy | None = None
+
+
+@dataclass(frozen=True)
+class CliStyle:
+    enabled: bool
+
+    def color(self, text: str, code: str) -> str:
+        if not self.enabled:
+            return text
+        return f"\033[{code}m{text}\033[0m"
+
+    def info(self, text: str) -> str:
+        return self.color(text, "36")
+
+    def warn(self, text: str) -> str:
+        return self.color(text, "33")
+
+    def error(self, text: str) -> str:
+        return self.color(text, "31")
+
+    def success(self, text: str) -> str:
+        return self.color(text, "32")
+
+    def title(self, text: str) -> str:
+        return self.color(text, "1;35")
+
+    def subtitle(self, text: str) -> str:
+        return self.color(text, "1;34")
+
+    def dim(self, text: str) -> str:
+        return self.color(text, "2")
+
+    def accent(self, text: str) -> str:
+        return self.color(text, "1;36")
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.counters: dict[str, int] = {}
+        self.events: list[dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        if not self.enabled or not amount:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self) -> dict[str, int]:
+        with self.lock:
+            return dict(self.counters)
+
+    def add_event(self, name: str, category: str, start: float, end: float, **args: Any) -> None:
+        if not self.enabled:
+            return
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - self.origin) * 1e6, 1),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        with self.lock:
+            self.events.append(event)
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = "phase", **args: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_event(name, category, start, time.perf_counter(), **args)
+
+    def event_args(self, category: str, **match: Any) -> list[dict[str, Any]]:
+        with self.lock:
+            events = list(self.events)
+        return [
+            event["args"]
+            for event in events
+            if event["cat"] == category and all(event["args"].get(key) == value for key, value in match.items())
+        ]
+
+    def seconds(self, category: str, name: str | None = None, **match: Any) -> float:
+        with self.lock:
+            events = list(self.events)
+        total = sum(
+            event["dur"]
+            for event in events
+            if event["cat"] == category
+            and (name is None or event["name"] == name)
+            and all(event["args"].get(key) == value for key, value in match.items())
+        )
+        return round(total / 1e6, 6)
+
+    def phase_seconds(self) -> dict[str, float]:
+        with self.lock:
+            names = sorted({event["name"] for event in self.events if event["cat"] == "phase"})
+        return {name: self.seconds("phase", name) for name in names}
+
+    def trace(self) -> dict[str, Any]:
+        with self.lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+        end = round((time.perf_counter() - self.origin) * 1e6, 1)
+        events.append({"name": "counters", "ph": "C", "ts": end, "pid": os.getpid(), "args": counters})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+PROFILER = Profiler()
+
+
+class EventStream:
+    def __init__(self) -> None:
+        self.handle: Any = None
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.handle is not None
+
+    def emit(self, event: str, **fields: Any) -> None:
+        if self.handle is None:
+            return
+        import json
+
+        line = json.dumps({"event": event, "ts": round(time.time(), 3), **fields}, ensure_ascii=False)
+        with self.lock:
+            try:
+                self.handle.write(line + "\n")
+                self.handle.flush()
+            except (BrokenPipeError, ValueError):
+                self.handle = None
+
+
+EVENTS = EventStream()
+EXPANDED_PATHS: dict[str, str] = {}
+
+
+def resolve_default_config_path() -> Path:
+    env_path = os.environ.get("ARCH_CACHE_CLEANER_CONFIG")
+    if env_path:
+        return Path(os.path.expanduser(os.path.expandvars(env_path))).resolve(strict=False)
+
+    candidates = [
+        Path(__file__).with_name("cache_paths.json"),
+        Path("/usr/share/arch-cache-cleaner/cache_paths.json"),
+    ]
+
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate.resolve(strict=False)
+
+    return candidates[0].resolve(strict=False)
+
+
+def parse_evict_policy(raw: Any) -> EvictPolicy | None:
+    if not isinstance(raw, dict):
+        return None
+
+    max_bytes = raw.get("max_bytes")
+    if isinstance(max_bytes, str):
+        try:
+            max_bytes = parse_size(max_bytes)
+        except argparse.ArgumentTypeError:
+            return None
+    if max_bytes is not None and (not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes < 0):
+        return None
+
+    older_than_days = raw.get("older_than_days")
+    if older_than_days is not None and (
+        not isinstance(older_than_days, (int, float)) or isinstance(older_than_days, bool) or older_than_days < 0
+    ):
+        return None
+
+    by = raw.get("by", "atime")
+    if by not in EVICT_AGE_FIELDS:
+        return None
+    if max_bytes is None and older_than_days is None:
+        return None
+    return EvictPolicy(max_bytes=max_bytes, older_than_days=older_than_days, by=by)
+
+
+def parse_pacman_policy(raw: Any) -> PacmanPolicy | None:
+    if not isinstance(raw, dict):
+        return None
+
+    keep = raw.get("keep", 3)
+    installed_only = raw.get("installed_only", False)
+    cache_dirs = raw.get("cache_dirs", list(PacmanPolicy.cache_dirs))
+    if not isinstance(keep, int) or isinstance(keep, bool) or keep < 0:
+        return None
+    if not isinstance(installed_only, bool):
+        return None
+    if not isinstance(cache_dirs, list) or not cache_dirs or not all(isinstance(item, str) for item in cache_dirs):
+        return None
+    return PacmanPolicy(keep=keep, installed_only=installed_only, cache_dirs=tuple(cache_dirs))
+
+
+def parse_engine_policy(raw: Any) -> EnginePolicy | None:
+    if not isinstance(raw, dict):
+        return None
+
+    sockets = raw.get("sockets")
+    prune = raw.get("prune", list(EnginePolicy.prune))
+    raw_fallback = raw.get("raw_fallback", True)
+    if not isinstance(sockets, dict) or not sockets:
+        return None
+    if not all(
+        isinstance(owned, list) and all(isinstance(path, str) for path in owned) for owned in sockets.values()
+    ):
+        return None
+    if not isinstance(prune, list) or not all(target in ENGINE_PRUNE_TARGETS for target in prune):
+        return None
+    if not isinstance(raw_fallback, bool):
+        return None
+    return EnginePolicy(
+        sockets=tuple((socket_path, tuple(owned)) for socket_path, owned in sockets.items()),
+        prune=tuple(prune),
+        raw_fallback=raw_fallback,
+    )
+
+
+def parse_watch_policy(raw: Any) -> WatchPolicy | None:
+    if not isinstance(raw, dict):
+        return None
+
+    max_bytes = raw.get("max_bytes")
+    if isinstance(max_bytes, str):
+        try:
+            max_bytes = parse_size(max_bytes)
+        except argparse.ArgumentTypeError:
+            return None
+    if not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes <= 0:
+        return None
+    return WatchPolicy(max_bytes=max_bytes)
+
+
+def parse_cache_config(raw: dict[str, Any]) -> dict[str, dict[str, CacheGroup]]:
+    parsed: dict[str, dict[str, CacheGroup]] = {}
+
+    for platform_key, group_map in raw.items():
+        if not isinstance(platform_key, str) or not isinstance(group_map, dict):
+            continue
+
+        groups: dict[str, CacheGroup] = {}
+        for group_key, group_data in group_map.items():
+            if not isinstance(group_key, str) or not isinstance(group_data, dict):
+                continue
+
+            title = group_data.get("title")
+            prompt = group_data.get("prompt")
+            paths = group_data.get("paths")
+
+            if not isinstance(title, str) or not isinstance(prompt, str) or not isinstance(paths, list):
+                continue
+            if not all(isinstance(path, str) for path in paths):
+                continue
+
+            evict = None
+            if "evict" in group_data:
+                evict = parse_evict_policy(group_data["evict"])
+                if evict is None:
+                    continue
+
+            pacman = None
+            if "pacman" in group_data:
+                pacman = parse_pacman_policy(group_data["pacman"])
+                if pacman is None:
+                    continue
+
+            watch = None
+            if "watch" in group_data:
+                watch = parse_watch_policy(group_data["watch"])
+                if watch is None:
+                    continue
+
+            engine = None
+            if "engine" in group_data:
+                engine = parse_engine_policy(group_data["engine"])
+                if engine is None or evict is not None or pacman is not None:
+                    continue
+
+            exclude = group_data.get("exclude", [])
+            if not isinstance(exclude, list) or not all(isinstance(pattern, str) for pattern in exclude):
+                continue
+
+            groups[group_key] = CacheGroup(
+                title=title,
+                prompt=prompt,
+                paths=paths,
+                evict=evict,
+                pacman=pacman,
+                watch=watch,
+                exclude=exclude,
+                engine=engine,
+            )
+
+        if groups:
+            parsed[platform_key] = groups
+
+    if not parsed:
+        raise ValueError("Config enthält keine gültigen Gruppen")
+
+    return parsed
+
+
+def parse_keep_list(raw: dict[str, Any]) -> list[str]:
+    keep = raw.get("keep", [])
+    if not isinstance(keep, list) or not all(isinstance(pattern, str) for pattern in keep):
+        raise ValueError("'keep' muss eine Liste von Pfaden/Mustern sein")
+    return keep
+
+
+def parse_config_bytes(content: bytes) -> tuple[dict[str, dict[str, CacheGroup]], list[str]]:
+    import json
+
+    raw = json.loads(content.decode("utf-8"))
+    if not isinstance(raw, dict):
+        raise ValueError("Config muss ein JSON-Objekt sein")
+    return parse_cache_config(raw), parse_keep_list(raw)
+
+
+def select_platform_groups(cache_paths: dict[str, dict[str, CacheGroup]], platform_key: str) -> dict[str, CacheGroup]:
+    groups = cache_paths.get(platform_key)
+    if groups is None:
+        groups = cache_paths.get("linux")
+    if groups is None and cache_paths:
+        groups = next(iter(cache_paths.values()))
+    return groups or {}
+
+
+def default_config_cache_path(config_path: Path) -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "arch-cache-cleaner" / f"config-{zlib.crc32(os.fsencode(str(config_path))):08x}.bin"
+
+
+def config_patterns(groups: dict[str, CacheGroup], keep: list[str]) -> list[str]:
+    patterns = [raw.removeprefix("!") for group in groups.values() for raw in group.paths]
+    patterns.extend(pattern for group in groups.values() for pattern in group.exclude)
+    patterns.extend(keep)
+    return patterns
+
+
+def config_environment(patterns: list[str]) -> dict[str, str | None]:
+    names = {"HOME", "USERPROFILE", "USER", "USERNAME"}
+    for raw in patterns:
+        for match in CONFIG_ENV_RE.finditer(raw):
+            names.add(match.group(1) or match.group(2))
+    return {name: os.environ.get(name) for name in sorted(names)}
+
+
+def group_from_cache(data: dict[str, Any]) -> CacheGroup:
+    return CacheGroup(
+        title=data["title"],
+        prompt=data["prompt"],
+        paths=data["paths"],
+        evict=EvictPolicy(**data["evict"]) if data["evict"] else None,
+        pacman=PacmanPolicy(**data["pacman"]) if data["pacman"] else None,
+        watch=WatchPolicy(**data["watch"]) if data["watch"] else None,
+        exclude=data["exclude"],
+        engine=EnginePolicy(**data["engine"]) if data["engine"] else None,
+    )
+
+
+def read_config_cache(
+    cache_path: Path, key: list[Any]
+) -> tuple[dict[str, CacheGroup], list[str], bool] | None:
+    try:
+        record = marshal.loads(cache_path.read_bytes())
+        if not isinstance(record, dict) or record.get("key") != key:
+            return None
+        groups = {group_key: group_from_cache(data) for group_key, data in record["groups"]}
+        keep = record["keep"]
+        environment = record["environment"]
+        expanded = record["expanded"]
+    except (OSError, EOFError, ValueError, TypeError, KeyError):
+        return None
+    if environment != {name: os.environ.get(name) for name in environment}:
+        return groups, keep, False
+    EXPANDED_PATHS.update(expanded)
+    return groups, keep, True
+
+
+def write_config_cache(cache_path: Path, key: list[Any], groups: dict[str, CacheGroup], keep: list[str]) -> None:
+    import tempfile
+
+    patterns = config_patterns(groups, keep)
+    record = {
+        "key": key,
+        "groups": [(group_key, asdict(group)) for group_key, group in groups.items()],
+        "keep": keep,
+        "environment": config_environment(patterns),
+        "expanded": {raw: expand_raw_path(raw) for raw in patterns},
+    }
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, prefix=f".{cache_path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(marshal.dumps(record))
+            os.replace(tmp_name, cache_path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+            raise
+    except OSError:
+        pass
+
+
+def load_platform_groups(
+    config_path: Path, platform_key: str, cache_path: Path | None
+) -> tuple[dict[str, CacheGroup], list[str], bool]:
+    if not config_path.exists():
+        raise FileNotFoundError(f"Config-Datei nicht gefunden: {config_path}")
+    stat_result = config_path.stat()
+    content = config_path.read_bytes()
+    key = [
+        CONFIG_CACHE_VERSION,
+        str(config_path),
+        platform_key,
+        stat_result.st_mtime_ns,
+        stat_result.st_size,
+        zlib.crc32(content),
+    ]
+
+    if cache_path is not None:
+        cached = read_config_cache(cache_path, key)
+        if cached is not None:
+            groups, keep, environment_matches = cached
+            if not environment_matches:
+                write_config_cache(cache_path, key, groups, keep)
+            return groups, keep, True
+
+    cache_paths, keep = parse_config_bytes(content)
+    groups = select_platform_groups(cache_paths, platform_key)
+    if cache_path is not None:
+        write_config_cache(cache_path, key, groups, keep)
+    return groups, keep, False
+
+
+def detect_platform() -> str:
+    value = sys.platform
+    if value.startswith("linux"):
+        return "linux"
+    if value == "darwin":
+        return "darwin"
+    if value in {"win32", "cygwin", "msys"}:
+        return "win32"
+    return "linux"
+
+
+@functools.cache
+def system_name() -> str:
+    if hasattr(os, "uname"):
+        return os.uname().sysname
+    import platform
+
+    return platform.system()
+
+
+def expand_raw_path(raw: str) -> str:
+    user = os.environ.get("USER") or os.environ.get("USERNAME") or "user"
+    formatted = raw.format(user=user)
+    return os.path.expanduser(os.path.expandvars(formatted))
+
+
+def expand_raw(raw: str) -> str:
+    expanded = EXPANDED_PATHS.get(raw)
+    if expanded is None:
+        expanded = EXPANDED_PATHS[raw] = expand_raw_path(raw)
+    return expanded
+
+
+def expand_path(raw: str) -> Path:
+    return Path(expand_raw(raw)).resolve(strict=False)
+
+
+def path_key(path: Path) -> str:
+    return str(path).lower() if os.name == "nt" else str(path)
+
+
+def dedupe_paths(paths: list[Path]) -> list[Path]:
+    unique: list[Path] = []
+    seen: set[str] = set()
+    for path in paths:
+        key = path_key(path)
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(path)
+    return unique
+
+
+@dataclass
+class TrieNode:
+    children: dict[str, TrieNode] = field(default_factory=dict)
+    terminal: bool = False
+
+
+@dataclass
+class PathTrie:
+    root: TrieNode = field(default_factory=TrieNode)
+
+    def covers(self, path: Path) -> bool:
+        node = self.root
+        for part in Path(path_key(path)).parts:
+            if node.terminal:
+                return True
+            child = node.children.get(part)
+            if child is None:
+                return False
+            node = child
+        return node.terminal
+
+    def has_descendants(self, path: Path) -> bool:
+        node = self.root
+        for part in Path(path_key(path)).parts:
+            child = node.children.get(part)
+            if child is None:
+                return False
+            node = child
+        return bool(node.children)
+
+    def insert(self, path: Path) -> None:
+        node = self.root
+        for part in Path(path_key(path)).parts:
+            node = node.children.setdefault(part, TrieNode())
+        node.terminal = True
+
+
+def path_identity(path: Path) -> tuple[int, int] | None:
+    try:
+        stat_result = path.stat()
+    except OSError:
+        return None
+    if stat_result.st_ino == 0:
+        return None
+    return stat_result.st_dev, stat_result.st_ino
+
+
+def collapse_nested_paths(group_paths: dict[str, list[Path]]) -> dict[str, list[Path]]:
+    trie = PathTrie()
+    seen_identities: set[tuple[int, int]] = set()
+    kept: set[tuple[str, str]] = set()
+
+    candidates = [
+        (len(path.parts), group_index, path_index, group_key, path)
+        for group_index, (group_key, paths) in enumerate(group_paths.items())
+        for path_index, path in enumerate(paths)
+    ]
+    for _depth, _group_index, _path_index, group_key, path in sorted(candidates, key=lambda item: item[:3]):
+        if trie.covers(path):
+            continue
+        identity = path_identity(path)
+        if identity is not None:
+            if identity in seen_identities:
+                continue
+            seen_identities.add(identity)
+        trie.insert(path)
+        kept.add((group_key, path_key(path)))
+
+    return {
+        group_key: [path for path in paths if (group_key, path_key(path)) in kept]
+        for group_key, paths in group_paths.items()
+    }
+
+
+def has_glob_magic(raw: str) -> bool:
+    return GLOB_MAGIC_RE.search(raw) is not None
+
+
+def glob_part_regex(part: str) -> str:
+    separator = re.escape(os.sep)
+    pieces: list[str] = []
+    index = 0
+    while index < len(part):
+        char = part[index]
+        index += 1
+        if char == "*":
+            pieces.append(f"[^{separator}]*")
+        elif char == "?":
+            pieces.append(f"[^{separator}]")
+        elif char == "[":
+            end = index
+            if end < len(part) and part[end] in "!^":
+                end += 1
+            if end < len(part) and part[end] == "]":
+                end += 1
+            end = part.find("]", end)
+            if end < 0:
+                pieces.append(re.escape(char))
+                continue
+            body = part[index:end].replace("\\", "\\\\")
+            index = end + 1
+            if body[:1] in ("!", "^"):
+                body = "^" + body[1:]
+            pieces.append(f"[{body}]")
+        else:
+            pieces.append(re.escape(char))
+    return "".join(pieces)
+
+
+def compile_glob_part(part: str) -> re.Pattern[str] | str | None:
+    if part == "**":
+        return None
+    if not has_glob_magic(part):
+        return part
+    hidden = "" if part.startswith(".") else r"(?!\.)"
+    return re.compile(hidden + glob_part_regex(part), re.IGNORECASE if os.name == "nt" else 0)
+
+
+def split_glob(expanded: str) -> tuple[Path, tuple[str, ...]]:
+    parts = Path(expanded).parts
+    magic_at = next((index for index, part in enumerate(parts) if has_glob_magic(part)), len(parts))
+    root = Path(*parts[:magic_at]) if magic_at else Path(".")
+    return root.resolve(strict=False), parts[magic_at:]
+
+
+def exclude_regex(expanded: str) -> str:
+    separator = re.escape(os.sep)
+    root, parts = split_glob(expanded)
+    pieces = [re.escape(str(root).rstrip(os.sep))]
+    for part in parts:
+        if part == "**":
+            pieces.append(f"(?:{separator}[^{separator}]+)*")
+        else:
+            pieces.append(separator + glob_part_regex(part))
+    pieces.append(f"(?:{separator}.*)?")
+    return "".join(pieces)
+
+
+def compile_exclude(expanded: str) -> re.Pattern[str]:
+    return re.compile(exclude_regex(expanded), re.IGNORECASE if os.name == "nt" else 0)
+
+
+class KeepRules:
+    def __init__(self, patterns: list[str]) -> None:
+        self.patterns = patterns
+        self.scope = PathTrie()
+        for expanded in patterns:
+            self.scope.insert(split_glob(expanded)[0])
+        combined = "|".join(f"(?:{exclude_regex(expanded)})" for expanded in patterns)
+        self.regex = re.compile(combined, re.IGNORECASE if os.name == "nt" else 0)
+
+    def matches(self, path: str) -> bool:
+        return self.regex.fullmatch(path) is not None
+
+    def may_contain(self, path: Path) -> bool:
+        return self.scope.covers(path) or self.scope.has_descendants(path)
+
+    def extended(self, paths: list[Path]) -> KeepRules:
+        return KeepRules([*self.patterns, *(str(path) for path in paths)])
+
+
+def build_keep_rules(raw_patterns: list[str], accounts: list[UserAccount] | None = None) -> KeepRules | None:
+    patterns = list(dict.fromkeys(
+        expanded for raw in raw_patterns for expanded, _account in path_expansions(raw, accounts)))
+    return KeepRules(patterns) if patterns else None
+
+
+class PathMatcher:
+    def __init__(self, patterns: list[PathPattern]) -> None:
+        self.patterns = patterns
+        self.steps = [tuple(compile_glob_part(part) for part in pattern.parts) for pattern in patterns]
+        self.matches: dict[int, list[str]] = {index: [] for index in range(len(patterns))}
+
+    def closure(self, states: set[tuple[int, int]]) -> set[tuple[int, int]]:
+        pending = list(states)
+        while pending:
+            pattern_index, position = pending.pop()
+            steps = self.steps[pattern_index]
+            if position < len(steps) and steps[position] is None and (pattern_index, position + 1) not in states:
+                states.add((pattern_index, position + 1))
+                pending.append((pattern_index, position + 1))
+        return states
+
+    def advance(self, states: set[tuple[int, int]], name: str, is_dir: bool) -> set[tuple[int, int]]:
+        following: set[tuple[int, int]] = set()
+        for pattern_index, position in states:
+            step = self.steps[pattern_index][position]
+            if step is None:
+                if is_dir and not name.startswith("."):
+                    following.add((pattern_index, position))
+            elif step == name if isinstance(step, str) else step.fullmatch(name):
+                following.add((pattern_index, position + 1))
+        return self.closure(following)
+
+    def entries(self, directory: str, states: set[tuple[int, int]]) -> Iterator[tuple[str, bool]]:
+        literals = {self.steps[pattern_index][position] for pattern_index, position in states}
+        if all(isinstance(step, str) for step in literals):
+            for name in literals:
+                PROFILER.count("glob_stat")
+                try:
+                    stat_result = os.lstat(os.path.join(directory, name))
+                except OSError:
+                    continue
+                if not stat.S_ISLNK(stat_result.st_mode):
+                    yield name, stat.S_ISDIR(stat_result.st_mode)
+            return
+
+        PROFILER.count("glob_listdir")
+        try:
+            with os.scandir(directory) as iterator:
+                for entry in iterator:
+                    try:
+                        if entry.is_symlink():
+                            continue
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    yield entry.name, is_dir
+        except OSError:
+            return
+
+    def record(self, path: str, states: set[tuple[int, int]], is_dir: bool) -> None:
+        for pattern_index, position in states:
+            if position == len(self.steps[pattern_index]) and (is_dir or not self.patterns[pattern_index].dir_only):
+                self.matches[pattern_index].append(path)
+
+    def expand(self, root: Path) -> dict[int, list[str]]:
+        start = self.closure({(index, 0) for index in range(len(self.patterns))})
+        if os.path.isdir(root):
+            self.record(str(root), start, True)
+        stack = [(str(root), {state for state in start if state[1] < len(self.steps[state[0]])})]
+        while stack:
+            directory, states = stack.pop()
+            if not states:
+                continue
+            for name, is_dir in self.entries(directory, states):
+                following = self.advance(states, name, is_dir)
+                if not following:
+                    continue
+                path = os.path.join(directory, name)
+                self.record(path, following, is_dir)
+                if is_dir:
+                    stack.append((path, {state for state in following if state[1] < len(self.steps[state[0]])}))
+        return self.matches
+
+
+def parse_uid_range(raw: str) -> tuple[int, int]:
+    first, separator, last = raw.partition("-")
+    try:
+        uid_range = (int(first), int(last) if separator else int(first))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ungültiger UID-Bereich: {raw} (z. B. 1000-60000)") from None
+    if uid_range[0] < 0 or uid_range[0] > uid_range[1]:
+        raise argparse.ArgumentTypeError(f"Ungültiger UID-Bereich: {raw} (z. B. 1000-60000)")
+    return uid_range
+
+
+def list_user_accounts(uid_range: tuple[int, int], passwd: Path = PASSWD_PATH) -> list[UserAccount]:
+    accounts: dict[str, UserAccount] = {}
+    for line in passwd.read_text(encoding="utf-8", errors="replace").splitlines():
+        fields = line.split(":")
+        if len(fields) < 7 or line.startswith("#"):
+            continue
+        name, _password, raw_uid, raw_gid, _gecos, home, shell = fields[:7]
+        try:
+            uid = int(raw_uid)
+            gid = int(raw_gid)
+        except ValueError:
+            continue
+        if not uid_range[0] <= uid <= uid_range[1] or shell in NOLOGIN_SHELLS:
+            continue
+        if name in accounts or not home or not os.path.isdir(home):
+            continue
+        accounts[name] = UserAccount(name=name, uid=uid, gid=gid, home=Path(home))
+    return list(accounts.values())
+
+
+def is_user_path(raw: str) -> bool:
+    if raw.startswith("~") or "{user}" in raw:
+        return True
+    return any((match.group(1) or match.group(2)) in USER_ENV_NAMES for match in CONFIG_ENV_RE.finditer(raw))
+
+
+def expand_user_raw(raw: str, account: UserAccount) -> str | None:
+    values = {"HOME": str(account.home), "USER": account.name, "USERNAME": account.name}
+    text = raw.format(user=account.name)
+    if text == "~" or text.startswith(("~/", "~" + os.sep)):
+        text = str(account.home) + text[1:]
+    elif text.startswith("~"):
+        return None
+    text = CONFIG_ENV_RE.sub(lambda match: values.get(match.group(1) or match.group(2), match.group(0)), text)
+    if CONFIG_ENV_RE.search(text):
+        return None
+    return text
+
+
+def path_expansions(raw: str, accounts: list[UserAccount] | None) -> list[tuple[str, UserAccount | None]]:
+    if accounts is None or not is_user_path(raw):
+        return [(expand_raw(raw), None)]
+    expansions: list[tuple[str, UserAccount | None]] = []
+    for account in accounts:
+        expanded = expand_user_raw(raw, account)
+        if expanded is not None:
+            expansions.append((expanded, account))
+    return expansions
+
+
+def user_path_allowed(path: Path, account: UserAccount) -> bool:
+    home = account.home.resolve(strict=False)
+    if path == home or home in path.parents:
+        return True
+    try:
+        return os.lstat(path).st_uid == account.uid
+    except OSError:
+        return False
+
+
+def path_account(path: Path, accounts: list[UserAccount]) -> UserAccount | None:
+    for account in accounts:
+        home = account.home.resolve(strict=False)
+        if path == home or home in path.parents:
+            return account
+    try:
+        owner = os.lstat(path).st_uid
+    except OSError:
+        return None
+    return next((account for account in accounts if account.uid == owner), None)
+
+
+@contextlib.contextmanager
+def run_as(account: UserAccount | None) -> Iterator[None]:
+    if account is None or not hasattr(os, "seteuid") or os.geteuid() != 0:
+        yield
+        return
+    groups = os.getgroups()
+    egid = os.getegid()
+    os.setgroups(os.getgrouplist(account.name, account.gid))
+    os.setegid(account.gid)
+    os.seteuid(account.uid)
+    try:
+        yield
+    finally:
+        os.seteuid(0)
+        os.setegid(egid)
+        os.setgroups(groups)
+
+
+def clean_as_owners(
+    paths: list[Path],
+    accounts: list[UserAccount] | None,
+    clean: Callable[[list[Path], UserAccount | None], list[tuple[Path, bool, list[str]]]],
+) -> list[tuple[Path, bool, list[str]]]:
+    if not accounts:
+        return clean(paths, None)
+    partitions: dict[UserAccount | None, list[Path]] = {}
+    for path in paths:
+        partitions.setdefault(path_account(path, accounts), []).append(path)
+    results: list[tuple[Path, bool, list[str]]] = []
+    for account, account_paths in partitions.items():
+        with run_as(account):
+            results.extend(clean(account_paths, account))
+    return results
+
+
+def resolve_group_paths(
+    groups: dict[str, CacheGroup],
+    accounts: list[UserAccount] | None = None,
+    owners: dict[Path, str] | None = None,
+) -> dict[str, list[Path]]:
+    resolved: dict[str, list[tuple[list[Path], UserAccount | None]]] = {}
+    excludes: dict[str, list[re.Pattern[str]]] = {}
+    patterns_by_root: dict[Path, list[PathPattern]] = {}
+
+    for group_key, group in groups.items():
+        entries: list[tuple[list[Path], UserAccount | None]] = []
+        excludes[group_key] = []
+        for raw in group.paths:
+            if raw.startswith("!"):
+                excludes[group_key].extend(
+                    compile_exclude(expanded) for expanded, _account in path_expansions(raw[1:], accounts))
+                continue
+            for expanded, account in path_expansions(raw, accounts):
+                entries.append(([], account))
+                if not has_glob_magic(expanded):
+                    entries[-1][0].append(Path(expanded).resolve(strict=False))
+                    continue
+                root, parts = split_glob(expanded)
+                pattern = PathPattern(
+                    group_key=group_key,
+                    source_index=len(entries) - 1,
+                    root=root,
+                    parts=parts,
+                    dir_only=expanded.endswith(("/", os.sep)),
+                )
+                patterns_by_root.setdefault(root, []).append(pattern)
+        resolved[group_key] = entries
+
+    for root, patterns in patterns_by_root.items():
+        matches = PathMatcher(patterns).expand(root)
+        for pattern_index, pattern in enumerate(patterns):
+            target = resolved[pattern.group_key][pattern.source_index][0]
+            target.extend(Path(path) for path in sorted(set(matches[pattern_index])))
+
+    group_paths: dict[str, list[Path]] = {}
+    for group_key in groups:
+        group_paths[group_key] = []
+        for paths, account in resolved[group_key]:
+            for path in paths:
+                if any(exclude.fullmatch(str(path)) for exclude in excludes[group_key]):
+                    continue
+                if account is not None and not user_path_allowed(path, account):
+                    if path_exists(path):
+                        print(f"[WARN] Übersprungen, zeigt aus {account.home} heraus: {path}")
+                    continue
+                group_paths[group_key].append(path)
+                if owners is not None:
+                    owners.setdefault(path, account.name if account is not None else "system")
+    return group_paths
+
+
+def user_rollup(group_reports: list[dict[str, Any]], owners: dict[Path, str]) -> dict[str, dict[str, int]]:
+    rollup: dict[str, dict[str, int]] = {}
+
+    def entry(path: str) -> dict[str, int]:
+        owner = owners.get(Path(path), "system")
+        return rollup.setdefault(owner, {"paths_found": 0, "found_bytes": 0, "cleaned": 0, "failed": 0})
+
+    for group_report in group_reports:
+        for path, size in group_report.get("paths_found_sizes", {}).items():
+            stats = entry(path)
+            stats["paths_found"] += 1
+            stats["found_bytes"] += size
+        for path in group_report["cleaned"]:
+            entry(path)["cleaned"] += 1
+        for path in group_report["failed"]:
+            entry(path)["failed"] += 1
+    return dict(sorted(rollup.items()))
+
+
+def path_exists(path: Path) -> bool:
+    try:
+        return path.exists()
+    except OSError:
+        return False
+
+
+def ask_yes_no(prompt: str, on_invalid: Callable[[], None] | None = None) -> bool:
+    while True:
+        answer = input(f"{prompt} [y/N]: ").strip().lower()
+        if answer in {"", "n", "no"}:
+            return False
+        if answer in {"y", "yes"}:
+            return True
+        if on_invalid is not None:
+            on_invalid()
+        print("Bitte y oder n eingeben.")
+
+
+def parse_size(raw: str) -> int:
+    units = {"": 1, "B": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+    value = raw.strip().upper().removesuffix("IB").removesuffix("B")
+    number = value.rstrip("KMGT")
+    unit = value[len(number):]
+    try:
+        size = float(number) * units[unit]
+    except (KeyError, ValueError):
+        raise argparse.ArgumentTypeError(f"Ungültige Größe: {raw} (z. B. 500M, 10G)") from None
+    if size < 0:
+        raise argparse.ArgumentTypeError(f"Größe muss >= 0 sein: {raw}")
+    return int(size)
+
+
+def format_bytes(size: int) -> str:
+    units = ["B", "KB", "MB", "GB", "TB"]
+    value = float(size)
+    for unit in units:
+        if value < 1024 or unit == units[-1]:
+            return f"{value:.1f} {unit}" if unit != "B" else f"{int(value)} B"
+        value /= 1024
+    return f"{size} B"
+
+
+def disk_usage_of(stat_result: os.stat_result) -> int:
+    blocks = getattr(stat_result, "st_blocks", None)
+    if blocks is None:
+        return stat_result.st_size
+    return blocks * 512
+
+
+def scan_directory(path: str) -> ScanResult:
+    total = 0
+    linked: list[tuple[int, int, int]] = []
+    subdirs: list[str] = []
+    stat_calls = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                stat_calls += 1
+                try:
+                    stat_result = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                usage = disk_usage_of(stat_result)
+                if stat.S_ISDIR(stat_result.st_mode):
+                    total += usage
+                    subdirs.append(entry.path)
+                elif stat_result.st_nlink > 1:
+                    linked.append((stat_result.st_dev, stat_result.st_ino, usage))
+                else:
+                    total += usage
+    except OSError:
+        pass
+    PROFILER.count("scan_listdir")
+    PROFILER.count("scan_stat", stat_calls)
+    return total, linked, subdirs
+
+
+def default_index_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "arch-cache-cleaner" / "size-index.json"
+
+
+def default_journal_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "arch-cache-cleaner" / "journal.jsonl"
+
+
+def default_history_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "arch-cache-cleaner" / "history.sqlite3"
+
+
+def default_trash_registry() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "arch-cache-cleaner" / "trash-dirs"
+
+
+class SizeIndex:
+    def __init__(self, path: Path, max_entries: int = SIZE_INDEX_MAX_ENTRIES) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, list[Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path, max_entries: int = SIZE_INDEX_MAX_ENTRIES) -> SizeIndex:
+        import json
+
+        index = cls(path, max_entries=max_entries)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return index
+        if not isinstance(raw, dict) or raw.get("version") != SIZE_INDEX_VERSION:
+            return index
+        entries = raw.get("entries")
+        if not isinstance(entries, list):
+            return index
+        for item in entries:
+            if isinstance(item, list) and len(item) == 7 and isinstance(item[0], str):
+                index.entries[item[0]] = item[1:]
+        return index
+
+    def lookup(self, path: str, stat_result: os.stat_result) -> ScanResult | None:
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is None or entry[:3] != [stat_result.st_mtime_ns, stat_result.st_dev, stat_result.st_ino]:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(path)
+            self.hits += 1
+        own_total, linked, names = entry[3:]
+        return own_total, [tuple(item) for item in linked], [os.path.join(path, name) for name in names]
+
+    def store(self, path: str, stat_result: os.stat_result, result: ScanResult) -> None:
+        if time.time_ns() - stat_result.st_mtime_ns < SIZE_INDEX_SETTLE_NS:
+            return
+        own_total, linked, subdirs = result
+        entry = [
+            stat_result.st_mtime_ns,
+            stat_result.st_dev,
+            stat_result.st_ino,
+            own_total,
+            [list(item) for item in linked],
+            [os.path.basename(subdir) for subdir in subdirs],
+        ]
+        with self.lock:
+            self.entries[path] = entry
+            self.entries.move_to_end(path)
+
+    def save(self) -> bool:
+        import json
+        import tempfile
+
+        with self.lock:
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            payload = {
+                "version": SIZE_INDEX_VERSION,
+                "entries": [[path, *entry] for path, entry in self.entries.items()],
+            }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=".size-index.", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, separators=(",", ":"))
+            os.replace(tmp_name, self.path)
+            return True
+        except OSError:
+            return False
+
+
+def scan_directory_indexed(path: str, index: SizeIndex) -> ScanResult:
+    try:
+        stat_result = os.lstat(path)
+    except OSError:
+        return 0, [], []
+    cached = index.lookup(path, stat_result)
+    if cached is not None:
+        return cached
+    result = scan_directory(path)
+    index.store(path, stat_result, result)
+    return result
+
+
+def submit_scan(executor: ThreadPoolExecutor, path: str, index: SizeIndex | None) -> Future[ScanResult]:
+    if index is None:
+        return executor.submit(scan_directory, path)
+    return executor.submit(scan_directory_indexed, path, index)
+
+
+def scan_sizes(
+    paths: list[Path],
+    workers: int = DEFAULT_SCAN_WORKERS,
+    index: SizeIndex | None = None,
+    seen_inodes: set[tuple[int, int]] | None = None,
+    on_sized: Callable[[Path, int], None] | None = None,
+) -> dict[Path, int]:
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    sizes: dict[Path, int] = {}
+    outstanding: dict[Path, int] = {}
+    if seen_inodes is None:
+        seen_inodes = set()
+
+    def add_linked(owner: Path, dev: int, ino: int, usage: int) -> None:
+        if (dev, ino) in seen_inodes:
+            return
+        seen_inodes.add((dev, ino))
+        sizes[owner] += usage
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending: dict[Future[ScanResult], Path] = {}
+        for path in dict.fromkeys(paths):
+            sizes[path] = 0
+            try:
+                stat_result = os.lstat(path)
+            except OSError:
+                continue
+            usage = disk_usage_of(stat_result)
+            if stat.S_ISDIR(stat_result.st_mode):
+                sizes[path] += usage
+                pending[submit_scan(executor, str(path), index)] = path
+                outstanding[path] = 1
+            elif stat_result.st_nlink > 1:
+                add_linked(path, stat_result.st_dev, stat_result.st_ino, usage)
+            else:
+                sizes[path] += usage
+
+        if on_sized is not None:
+            for path, size in sizes.items():
+                if path not in outstanding:
+                    on_sized(path, size)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                owner = pending.pop(future)
+                total, linked, subdirs = future.result()
+                sizes[owner] += total
+                for dev, ino, usage in linked:
+                    add_linked(owner, dev, ino, usage)
+                for subdir in subdirs:
+                    pending[submit_scan(executor, subdir, index)] = owner
+                outstanding[owner] += len(subdirs) - 1
+                if on_sized is not None and not outstanding[owner]:
+                    on_sized(owner, sizes[owner])
+
+    return sizes
+
+
+def start_background_sizing(paths: list[Path], index: SizeIndex | None) -> dict[Path, Future[int]]:
+    from concurrent.futures import Future
+
+    futures: dict[Path, Future[int]] = {path: Future() for path in dict.fromkeys(paths)}
+
+    def sized(path: Path, size: int) -> None:
+        futures[path].set_result(size)
+
+    def run() -> None:
+        try:
+            with PROFILER.span("scan"):
+                scan_sizes(list(futures), index=index, on_sized=sized)
+        except Exception as exc:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(exc)
+
+    threading.Thread(target=run, name="background-sizer", daemon=True).start()
+    return futures
+
+
+def save_size_index(index: SizeIndex | None, debug: bool, style: CliStyle) -> None:
+    if index is None:
+        return
+    debug_log(debug, style, f"Size index: {index.hits} hits, {index.misses} misses")
+    if not index.save():
+        debug_log(debug, style, f"Size index could not be written: {index.path}")
+
+
+def dangerous_path(path: Path) -> bool:
+    raw = str(path)
+    blocked = {
+        "/",
+        str(Path.home().anchor),
+        "C:\\",
+        "D:\\",
+        "E:\\",
+    }
+    return raw in blocked
+
+
+def argv_budget() -> int:
+    try:
+        arg_max = os.sysconf("SC_ARG_MAX")
+    except (AttributeError, ValueError, OSError):
+        arg_max = 131072
+    if arg_max <= 0:
+        arg_max = 131072
+    env_size = sum(len(key) + len(value) + 2 + 8 for key, value in os.environ.items())
+    return max(4096, (arg_max - env_size) // 2)
+
+
+def argv_chunks(prefix: list[str], items: list[str], budget: int) -> list[list[str]]:
+    prefix_size = sum(len(os.fsencode(arg)) + 1 + 8 for arg in prefix)
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    current_size = prefix_size
+    for item in items:
+        item_size = len(os.fsencode(item)) + 1 + 8
+        if current and current_size + item_size > budget:
+            chunks.append(prefix + current)
+            current = []
+            current_size = prefix_size
+        current.append(item)
+        current_size += item_size
+    if current:
+        chunks.append(prefix + current)
+    return chunks
+
+
+def privileged_remove(paths: list[Path]) -> list[Path]:
+    import shutil
+    import subprocess
+
+    if not paths:
+        return []
+    if os.name != "posix" or shutil.which("sudo") is None or os.geteuid() != os.getuid():
+        for path in paths:
+            print(f"[WARN] Keine Rechte für: {path}")
+        return list(paths)
+
+    by_name = {str(path): path for path in paths}
+    failed: list[Path] = []
+    with PROFILER.span("escalate", entries=len(paths)):
+        prefix = ["sudo", "sh", "-c", PRIVILEGED_REMOVE_SCRIPT, "sh"]
+        for command in argv_chunks(prefix, list(by_name), argv_budget()):
+            PROFILER.count("subprocess")
+            result = subprocess.run(command, check=False, stdout=subprocess.PIPE)
+            if result.returncode != 0:
+                failed.extend(by_name[name] for name in command[len(prefix) :])
+                continue
+            failed.extend(by_name[os.fsdecode(name)] for name in result.stdout.split(b"\0") if name)
+
+    for path in failed:
+        print(f"[WARN] Löschen fehlgeschlagen: {path}")
+    return failed
+
+
+def remove_entry(path: Path, dry_run: bool, deferred: list[Path] | None = None) -> bool:
+    import shutil
+
+    if not path_exists(path):
+        return True
+
+    if dangerous_path(path):
+        print(f"[WARN] Übersprungen (unsicherer Pfad): {path}")
+        return False
+
+    if dry_run:
+        print(f"[DRY-RUN] remove: {path}")
+        return True
+
+    try:
+        if path.is_dir() and not path.is_symlink():
+            PROFILER.count("rmtree")
+            shutil.rmtree(path)
+        else:
+            PROFILER.count("unlink")
+            path.unlink()
+        return True
+    except PermissionError:
+        if deferred is not None:
+            deferred.append(path)
+            return True
+        return not privileged_remove([path])
+    except OSError:
+        print(f"[WARN] Löschen fehlgeschlagen: {path}")
+        return False
+
+
+@dataclass
+class DeleteJob:
+    path: Path
+    keep: KeepRules | None = None
+    dir_fd: int | None = None
+    done: threading.Event = field(default_factory=threading.Event)
+    ok: bool = True
+    freed: int = 0
+    finished: float = 0.0
+    counters: dict[str, int] = field(default_factory=dict)
+
+    def complete(self) -> None:
+        self.finished = time.perf_counter()
+        self.done.set()
+
+
+@dataclass
+class DeleteNode:
+    path: str
+    name: str
+    job: DeleteJob
+    parent: DeleteNode | None
+    device: int
+    inode: int
+    usage: int = 0
+    remaining: int = 1
+    retain: bool = False
+    fd: int = -1
+    unlinks: int = 0
+    kept: int = 0
+    freed: int = 0
+
+
+def merge_counters(target: dict[str, int], counters: dict[str, int]) -> dict[str, int]:
+    for name, value in counters.items():
+        if value:
+            target[name] = target.get(name, 0) + value
+    return target
+
+
+class DeletionEngine:
+    def __init__(self, jobs: int = DEFAULT_DELETE_JOBS) -> None:
+        self.jobs = max(1, jobs)
+        self.pools: dict[int, ThreadPoolExecutor] = {}
+        self.lock = threading.Lock()
+        self.open_dirs = 0
+        self.fd_safe = os.open in os.supports_dir_fd and os.scandir in os.supports_fd and hasattr(os, "O_NOFOLLOW")
+
+    def close(self) -> None:
+        for pool in self.pools.values():
+            pool.shutdown(wait=True)
+        self.pools.clear()
+
+    def submit(self, device: int, fn: Any, *args: Any) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with self.lock:
+            pool = self.pools.get(device)
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix=f"delete-{device}")
+                self.pools[device] = pool
+        pool.submit(fn, *args)
+
+    def account(self, job: DeleteJob, freed: int, counters: dict[str, int]) -> None:
+        for name, value in counters.items():
+            PROFILER.count(name, value)
+        if not PROFILER.enabled:
+            return
+        with self.lock:
+            job.freed += freed
+            merge_counters(job.counters, counters)
+
+    def open_root(self, path: Path) -> int | None:
+        if not self.fd_safe:
+            return None
+        return os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+
+    def locate(self, node: DeleteNode) -> tuple[str, int | None]:
+        if not self.fd_safe:
+            return node.path, None
+        return node.name, node.parent.fd if node.parent is not None else node.job.dir_fd
+
+    def start(self, path: Path, keep: KeepRules | None = None, dir_fd: int | None = None) -> DeleteJob:
+        job = DeleteJob(path=path, keep=keep, dir_fd=dir_fd)
+        name = path.name if dir_fd is not None else str(path)
+        try:
+            stat_result = os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
+        except FileNotFoundError:
+            job.complete()
+            return job
+        except OSError:
+            job.ok = False
+            job.complete()
+            return job
+
+        usage = disk_usage_of(stat_result) if stat_result.st_nlink <= 1 or stat.S_ISDIR(stat_result.st_mode) else 0
+        if stat.S_ISDIR(stat_result.st_mode):
+            node = DeleteNode(
+                path=str(path),
+                name=name,
+                job=job,
+                parent=None,
+                device=stat_result.st_dev,
+                inode=stat_result.st_ino,
+                usage=usage,
+            )
+            self.submit(stat_result.st_dev, self.clear_directory, node)
+        else:
+            self.submit(stat_result.st_dev, self.unlink_entry, job, name, usage)
+        return job
+
+    def unlink_entry(self, job: DeleteJob, name: str, usage: int) -> None:
+        try:
+            os.unlink(name, dir_fd=job.dir_fd)
+            self.account(job, usage, {"unlink": 1})
+        except FileNotFoundError:
+            pass
+        except OSError:
+            job.ok = False
+        job.complete()
+
+    def open_directory(self, node: DeleteNode) -> Iterator[os.DirEntry[str]] | None:
+        if not self.fd_safe:
+            try:
+                return os.scandir(node.path)
+            except FileNotFoundError:
+                return None
+            except OSError:
+                node.job.ok = False
+                return None
+
+        name, dir_fd = self.locate(node)
+        try:
+            fd = os.open(name, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW, dir_fd=dir_fd)
+        except FileNotFoundError:
+            return None
+        except OSError:
+            node.job.ok = False
+            node.retain = True
+            return None
+        opened = os.fstat(fd)
+        if (opened.st_dev, opened.st_ino) != (node.device, node.inode):
+            os.close(fd)
+            node.job.ok = False
+            node.retain = True
+            return None
+        node.fd = fd
+        with self.lock:
+            self.open_dirs += 1
+        try:
+            return os.scandir(fd)
+        except OSError:
+            node.job.ok = False
+            node.retain = True
+            return None
+
+    def descend(self, node: DeleteNode, stack: list[tuple[DeleteNode, Iterator[os.DirEntry[str]]]]) -> None:
+        entries = self.open_directory(node)
+        if entries is None:
+            self.finish(node)
+            return
+        stack.append((node, entries))
+
+    def clear_directory(self, node: DeleteNode) -> None:
+        stack: list[tuple[DeleteNode, Iterator[os.DirEntry[str]]]] = []
+        self.descend(node, stack)
+        while stack:
+            current, entries = stack[-1]
+            try:
+                entry = next(entries, None)
+            except OSError:
+                current.job.ok = False
+                entry = None
+            if entry is None:
+                entries.close()
+                stack.pop()
+                self.account(current.job, current.freed, {
+                    "delete_listdir": 1,
+                    "unlink": current.unlinks,
+                    "delete_kept": current.kept,
+                })
+                self.finish(current)
+                continue
+            self.clear_entry(current, entry, stack)
+
+    def clear_entry(
+        self,
+        current: DeleteNode,
+        entry: os.DirEntry[str],
+        stack: list[tuple[DeleteNode, Iterator[os.DirEntry[str]]]],
+    ) -> None:
+        keep = current.job.keep
+        path = os.path.join(current.path, entry.name)
+        if keep is not None and keep.matches(path):
+            current.retain = True
+            current.kept += 1
+            return
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                stat_result = entry.stat(follow_symlinks=False)
+                child = DeleteNode(
+                    path=path,
+                    name=entry.name,
+                    job=current.job,
+                    parent=current,
+                    device=stat_result.st_dev,
+                    inode=stat_result.st_ino,
+                    usage=disk_usage_of(stat_result),
+                )
+                with self.lock:
+                    current.remaining += 1
+                    offload = self.open_dirs < DELETE_OPEN_DIRS
+                if offload:
+                    self.submit(stat_result.st_dev, self.clear_directory, child)
+                else:
+                    self.descend(child, stack)
+                return
+            if PROFILER.enabled:
+                stat_result = entry.stat(follow_symlinks=False)
+                if stat_result.st_nlink <= 1:
+                    current.freed += disk_usage_of(stat_result)
+            if self.fd_safe:
+                os.unlink(entry.name, dir_fd=current.fd)
+            else:
+                os.unlink(path)
+            current.unlinks += 1
+        except FileNotFoundError:
+            pass
+        except OSError:
+            current.job.ok = False
+
+    def finish(self, node: DeleteNode | None) -> None:
+        while node is not None:
+            with self.lock:
+                node.remaining -= 1
+                if node.remaining > 0:
+                    return
+                if node.retain and node.parent is not None:
+                    node.parent.retain = True
+            if node.fd >= 0:
+                os.close(node.fd)
+                node.fd = -1
+                with self.lock:
+                    self.open_dirs -= 1
+            if not node.retain:
+                name, dir_fd = self.locate(node)
+                try:
+                    os.rmdir(name, dir_fd=dir_fd)
+                    self.account(node.job, node.usage, {"rmdir": 1})
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    node.job.ok = False
+            if node.parent is None:
+                node.job.complete()
+            node = node.parent
+
+
+def read_trash_registry(registry: Path) -> list[Path]:
+    try:
+        lines = registry.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+    return [Path(line) for line in dict.fromkeys(lines) if line and Path(line).name == TRASH_DIR_NAME]
+
+
+def pending_trash(registry: Path) -> list[Path]:
+    pending: list[Path] = []
+    for staging in read_trash_registry(registry):
+        try:
+            with os.scandir(staging) as entries:
+                if any(True for _entry in entries):
+                    pending.append(staging)
+        except OSError:
+            continue
+    return pending
+
+
+@contextlib.contextmanager
+def trash_registry_lock(registry: Path) -> Iterator[None]:
+    import fcntl
+
+    registry.parent.mkdir(parents=True, exist_ok=True)
+    with open(registry.with_name(registry.name + ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+class TrashStager:
+    def __init__(self, registry: Path, run_id: str) -> None:
+        self.registry = registry
+        self.run_id = run_id
+        self.staged: list[str] = []
+
+    def register(self, staging: Path, device: int) -> bool:
+        with trash_registry_lock(self.registry):
+            with contextlib.suppress(FileExistsError):
+                os.mkdir(staging, 0o700)
+            staging_stat = os.lstat(staging)
+            if not stat.S_ISDIR(staging_stat.st_mode) or staging_stat.st_dev != device:
+                return False
+            if staging not in read_trash_registry(self.registry):
+                with open(self.registry, "a", encoding="utf-8") as handle:
+                    handle.write(f"{staging}\n")
+        return True
+
+    def stage(self, path: Path) -> bool:
+        try:
+            path_stat = os.lstat(path)
+            if not stat.S_ISDIR(path_stat.st_mode) or dangerous_path(path) or os.path.ismount(path):
+                return False
+            staging = path.parent / TRASH_DIR_NAME
+            if os.lstat(path.parent).st_dev != path_stat.st_dev or not self.register(staging, path_stat.st_dev):
+                return False
+            target = staging / f"{path.name}.{self.run_id}"
+            os.rename(path, target)
+        except OSError:
+            return False
+
+        try:
+            os.mkdir(path, 0o700)
+            os.chmod(path, stat.S_IMODE(path_stat.st_mode))
+            if hasattr(os, "geteuid") and os.geteuid() == 0:
+                os.chown(path, path_stat.st_uid, path_stat.st_gid)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.rmdir(path)
+            try:
+                os.rename(target, path)
+            except OSError:
+                print(f"[WARN] Verzeichnis nach dem Verschieben nicht wiederhergestellt: {path} (liegt in {target})")
+            return False
+        PROFILER.count("staged")
+        self.staged.append(str(path))
+        return True
+
+
+def purge_trash(registry: Path, engine: DeletionEngine) -> int:
+    import fcntl
+
+    registry.parent.mkdir(parents=True, exist_ok=True)
+    with open(registry.with_name(registry.name + ".worker"), "w") as worker:
+        fcntl.flock(worker, fcntl.LOCK_EX)
+
+        failed = 0
+        attempted: set[str] = set()
+        while True:
+            jobs: list[DeleteJob] = []
+            staging_fds: list[int] = []
+            for staging in pending_trash(registry):
+                try:
+                    staging_fd = engine.open_root(staging)
+                    names = os.listdir(staging if staging_fd is None else staging_fd)
+                except FileNotFoundError:
+                    continue
+                if staging_fd is not None:
+                    staging_fds.append(staging_fd)
+                for name in names:
+                    if str(staging / name) not in attempted:
+                        attempted.add(str(staging / name))
+                        jobs.append(engine.start(staging / name, dir_fd=staging_fd))
+            for job in jobs:
+                job.done.wait()
+                if not job.ok:
+                    failed += 1
+            for staging_fd in staging_fds:
+                os.close(staging_fd)
+            if not jobs:
+                break
+
+        with trash_registry_lock(registry):
+            remaining = []
+            for staging in read_trash_registry(registry):
+                with contextlib.suppress(OSError):
+                    os.rmdir(staging)
+                if os.path.lexists(staging):
+                    remaining.append(f"{staging}\n")
+            registry.write_text("".join(remaining), encoding="utf-8")
+    return failed
+
+
+def spawn_trash_worker(nice: int, ionice: str) -> int | None:
+    import shutil
+    import subprocess
+
+    command = [sys.executable, str(Path(__file__).resolve()), "--purge-trash", "--background-nice", str(nice)]
+    io_class = IONICE_CLASSES[ionice]
+    if io_class is not None and shutil.which("ionice") is not None:
+        command = ["ionice", "-c", io_class, *command]
+    try:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError as exc:
+        print(f"[WARN] Hintergrund-Löschung konnte nicht gestartet werden: {exc}")
+        return None
+    return process.pid
+
+
+def clear_paths(
+    paths: list[Path],
+    dry_run: bool,
+    engine: DeletionEngine,
+    keep: KeepRules | None = None,
+    on_done: Callable[[Path, bool, list[str]], None] | None = None,
+    stager: TrashStager | None = None,
+) -> list[tuple[Path, bool, list[str]]]:
+    denied: list[Path] = []
+    owners: dict[Path, Path] = {}
+    failed_entries: dict[Path, list[str]] = {path: [] for path in paths}
+    reported: set[Path] = set()
+
+    def remove_deferred(owner: Path, entry: Path) -> None:
+        pending = len(denied)
+        if not remove_entry(entry, dry_run=dry_run, deferred=denied):
+            failed_entries[owner].append(str(entry))
+        elif len(denied) > pending:
+            owners[entry] = owner
+
+    started: list[tuple[Path, list[DeleteJob], float, float, dict[str, int]]] = []
+    directory_fds: dict[Path, list[int]] = {path: [] for path in paths}
+    for path in paths:
+        if not path_exists(path) or (keep is not None and keep.matches(str(path))):
+            continue
+        path_started = time.perf_counter()
+        if stager is not None and not dry_run and (keep is None or not keep.may_contain(path)) and stager.stage(path):
+            started.append((path, [], path_started, time.perf_counter(), {"staged": 1}))
+            continue
+        if path.is_file() or path.is_symlink():
+            remove_deferred(path, path)
+            started.append((path, [], path_started, time.perf_counter(), {}))
+            continue
+
+        jobs: list[DeleteJob] = []
+        directories = [path]
+        while directories:
+            directory = directories.pop()
+            directory_fd = None
+            try:
+                if not dry_run:
+                    directory_fd = engine.open_root(directory)
+                if directory_fd is not None:
+                    directory_fds[path].append(directory_fd)
+                    children = [directory / name for name in os.listdir(directory_fd)]
+                else:
+                    children = list(directory.iterdir())
+            except OSError:
+                print(f"[WARN] Löschen fehlgeschlagen: {directory}")
+                failed_entries[path].append(str(directory))
+                continue
+
+            for child in children:
+                if keep is not None and keep.matches(str(child)):
+                    continue
+                if dry_run or dangerous_path(child):
+                    if keep is not None and keep.may_contain(child) and child.is_dir() and not child.is_symlink():
+                        directories.append(child)
+                    else:
+                        remove_deferred(path, child)
+                else:
+                    jobs.append(engine.start(child, keep, dir_fd=directory_fd))
+        started.append((path, jobs, path_started, time.perf_counter(), {}))
+
+    for path, jobs, path_started, listed_at, counters in started:
+        for job in jobs:
+            job.done.wait()
+            if not job.ok and keep is not None and keep.may_contain(job.path):
+                print(f"[WARN] Löschen fehlgeschlagen: {job.path}")
+                failed_entries[path].append(str(job.path))
+            elif not job.ok:
+                remove_deferred(path, job.path)
+        for directory_fd in directory_fds[path]:
+            os.close(directory_fd)
+        if PROFILER.enabled:
+            for job in jobs:
+                merge_counters(counters, job.counters)
+            PROFILER.add_event(
+                "clear",
+                "path",
+                path_started,
+                max([listed_at, *(job.finished for job in jobs)]),
+                path=str(path),
+                bytes_freed=sum(job.freed for job in jobs),
+                counters=counters,
+            )
+        if on_done is not None and path not in owners.values():
+            on_done(path, not failed_entries[path], failed_entries[path])
+            reported.add(path)
+
+    for entry in privileged_remove(denied):
+        failed_entries[owners[entry]].append(str(entry))
+
+    results = [(path, not failed_entries[path], failed_entries[path]) for path in paths]
+    if on_done is not None:
+        for path, path_ok, path_failed_entries in results:
+            if path not in reported:
+                on_done(path, path_ok, path_failed_entries)
+    return results
+
+
+def iter_files(root: Path, keep: KeepRules | None = None) -> Iterator[tuple[str, os.stat_result]]:
+    try:
+        root_device = os.lstat(root).st_dev
+    except OSError:
+        return
+
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        PROFILER.count("scan_listdir")
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if keep is not None and keep.matches(entry.path):
+                        continue
+                    PROFILER.count("scan_stat")
+                    try:
+                        stat_result = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if stat.S_ISDIR(stat_result.st_mode):
+                        if stat_result.st_dev == root_device:
+                            stack.append(entry.path)
+                    elif stat.S_ISREG(stat_result.st_mode):
+                        yield entry.path, stat_result
+        except OSError:
+            continue
+
+
+def evict_group(
+    paths: list[Path], policy: EvictPolicy, dry_run: bool, keep: KeepRules | None = None
+) -> tuple[list[tuple[Path, bool, list[str]]], int, int]:
+    import heapq
+
+    attribute = f"st_{policy.by}"
+    cutoff = None
+    if policy.older_than_days is not None:
+        cutoff = datetime.now().timestamp() - policy.older_than_days * 86400
+
+    failed_entries: dict[Path, list[str]] = {path: [] for path in paths}
+    denied: list[Path] = []
+    owners: dict[Path, tuple[Path, int]] = {}
+    evicted = [0, 0]
+    freed: dict[Path, int] = {path: 0 for path in paths}
+    unlinks: dict[Path, int] = {path: 0 for path in paths}
+    spans: dict[Path, tuple[float, float]] = {}
+
+    def evict(entry_path: str, usage: int, owner: Path) -> bool:
+        if dry_run:
+            print(f"[DRY-RUN] remove: {entry_path}")
+        else:
+            try:
+                os.unlink(entry_path)
+                PROFILER.count("unlink")
+                freed[owner] += usage
+                unlinks[owner] += 1
+            except FileNotFoundError:
+                return True
+            except PermissionError:
+                denied.append(Path(entry_path))
+                owners[Path(entry_path)] = (owner, usage)
+            except OSError:
+                print(f"[WARN] Löschen fehlgeschlagen: {entry_path}")
+                failed_entries[owner].append(entry_path)
+                return False
+        evicted[0] += 1
+        evicted[1] += usage
+        return True
+
+    total = 0
+    seen_inodes: set[tuple[int, int]] = set()
+    ranked: list[tuple[float, str, int, Path]] = []
+    for owner in paths:
+        owner_started = time.perf_counter()
+        for entry_path, stat_result in iter_files(owner, keep):
+            if stat_result.st_nlink > 1:
+                inode = (stat_result.st_dev, stat_result.st_ino)
+                if inode in seen_inodes:
+                    continue
+                seen_inodes.add(inode)
+            usage = disk_usage_of(stat_result)
+            timestamp = getattr(stat_result, attribute)
+            if cutoff is not None and timestamp < cutoff:
+                evict(entry_path, usage, owner)
+                continue
+            total += usage
+            if policy.max_bytes is not None:
+                ranked.append((timestamp, entry_path, usage, owner))
+        spans[owner] = (owner_started, time.perf_counter())
+
+    if policy.max_bytes is not None and total > policy.max_bytes:
+        heapq.heapify(ranked)
+        while ranked and total > policy.max_bytes:
+            _timestamp, entry_path, usage, owner = heapq.heappop(ranked)
+            if evict(entry_path, usage, owner):
+                total -= usage
+
+    failed_denied = set(privileged_remove(denied))
+    for entry in denied:
+        owner, usage = owners[entry]
+        if entry not in failed_denied:
+            freed[owner] += usage
+            continue
+        failed_entries[owner].append(str(entry))
+        evicted[0] -= 1
+        evicted[1] -= usage
+
+    for path, (owner_started, owner_finished) in spans.items():
+        PROFILER.add_event(
+            "evict",
+            "path",
+            owner_started,
+            owner_finished,
+            path=str(path),
+            bytes_freed=freed[path],
+            counters={"unlink": unlinks[path]} if unlinks[path] else {},
+        )
+    results = [(path, not failed_entries[path], failed_entries[path]) for path in paths]
+    return results, evicted[0], evicted[1]
+
+
+def rpmvercmp(first: str, second: str) -> int:
+    if first == second:
+        return 0
+
+    def is_alpha(char: str) -> bool:
+        return char.isascii() and char.isalpha()
+
+    def is_digit(char: str) -> bool:
+        return char.isascii() and char.isdigit()
+
+    one = two = 0
+    prev_one = prev_two = 0
+    while one < len(first) and two < len(second):
+        while one < len(first) and not (is_alpha(first[one]) or is_digit(first[one])):
+            one += 1
+        while two < len(second) and not (is_alpha(second[two]) or is_digit(second[two])):
+            two += 1
+        if one >= len(first) or two >= len(second):
+            break
+        if one - prev_one != two - prev_two:
+            return -1 if one - prev_one < two - prev_two else 1
+
+        end_one, end_two = one, two
+        is_number = is_digit(first[one])
+        matches = is_digit if is_number else is_alpha
+        while end_one < len(first) and matches(first[end_one]):
+            end_one += 1
+        while end_two < len(second) and matches(second[end_two]):
+            end_two += 1
+
+        segment_one, segment_two = first[one:end_one], second[two:end_two]
+        if not segment_two:
+            return 1 if is_number else -1
+        if is_number:
+            segment_one, segment_two = segment_one.lstrip("0"), segment_two.lstrip("0")
+            if len(segment_one) != len(segment_two):
+                return 1 if len(segment_one) > len(segment_two) else -1
+        if segment_one != segment_two:
+            return 1 if segment_one > segment_two else -1
+        one = prev_one = end_one
+        two = prev_two = end_two
+
+    if one >= len(first) and two >= len(second):
+        return 0
+    if (one >= len(first) and not is_alpha(second[two])) or (one < len(first) and is_alpha(first[one])):
+        return -1
+    return 1
+
+
+def parse_evr(version: str) -> tuple[str, str, str | None]:
+    epoch = "0"
+    head, separator, rest = version.partition(":")
+    if separator and head.isdigit():
+        epoch, version = head, rest
+    elif separator and not head:
+        version = rest
+    release = None
+    if "-" in version:
+        version, release = version.rsplit("-", 1)
+    return epoch, version, release
+
+
+def pacman_vercmp(first: str, second: str) -> int:
+    if first == second:
+        return 0
+    epoch_one, version_one, release_one = parse_evr(first)
+    epoch_two, version_two, release_two = parse_evr(second)
+    result = rpmvercmp(epoch_one, epoch_two)
+    if result == 0:
+        result = rpmvercmp(version_one, version_two)
+    if result == 0 and release_one is not None and release_two is not None:
+        result = rpmvercmp(release_one, release_two)
+    return result
+
+
+def installed_pacman_packages(local_db: Path = PACMAN_LOCAL_DB) -> set[str]:
+    installed: set[str] = set()
+    try:
+        with os.scandir(local_db) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False) and entry.name.count("-") >= 2:
+                    installed.add(entry.name.rsplit("-", 2)[0])
+    except OSError:
+        pass
+    return installed
+
+
+def plan_pacman_prune(cache_dir: Path, keep: int, installed: set[str] | None) -> list[Path]:
+    packages: dict[tuple[str, str], list[tuple[str, str]]] = {}
+    signatures: dict[str, list[str]] = {}
+    try:
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".sig"):
+                    signatures.setdefault(entry.name[:-4], []).append(entry.name)
+                    continue
+                match = PACMAN_PACKAGE_RE.match(entry.name)
+                if match is None or not entry.is_file(follow_symlinks=False):
+                    continue
+                key = (match.group("name"), match.group("arch"))
+                packages.setdefault(key, []).append((match.group("version"), entry.name))
+    except OSError:
+        return []
+
+    removals: list[Path] = []
+    for (name, _arch), versions in packages.items():
+        keep_count = 0 if installed is not None and name not in installed else keep
+        if len(versions) <= keep_count:
+            continue
+        versions.sort(key=functools.cmp_to_key(lambda one, two: pacman_vercmp(one[0], two[0])), reverse=True)
+        for _version, filename in versions[keep_count:]:
+            removals.append(cache_dir / filename)
+            removals.extend(cache_dir / signature for signature in signatures.get(filename, []))
+    return removals
+
+
+def prune_pacman_group(
+    paths: list[Path], policy: PacmanPolicy, dry_run: bool, engine: DeletionEngine, keep: KeepRules | None = None
+) -> tuple[list[tuple[Path, bool, list[str]]], int]:
+    cache_dirs = dedupe_paths([expand_path(raw) for raw in policy.cache_dirs])
+    targets: list[tuple[Path, Path]] = []
+    for cache_dir in cache_dirs:
+        owner = next((path for path in paths if path == cache_dir or path in cache_dir.parents), None)
+        if owner is not None and path_exists(cache_dir):
+            targets.append((owner, cache_dir))
+
+    kept_dirs = [cache_dir for _owner, cache_dir in targets]
+    results = clear_paths(
+        paths,
+        dry_run=dry_run,
+        engine=engine,
+        keep=keep.extended(kept_dirs) if keep is not None else build_keep_rules([str(path) for path in kept_dirs]),
+    )
+    failed_entries = {path: entries for path, _ok, entries in results}
+    installed = installed_pacman_packages() if policy.installed_only else None
+
+    removed = 0
+    denied: list[Path] = []
+    owners: dict[Path, Path] = {}
+    for owner, cache_dir in targets:
+        target_started = time.perf_counter()
+        freed = 0
+        unlinks = 0
+        for entry in plan_pacman_prune(cache_dir, policy.keep, installed):
+            if keep is not None and keep.matches(str(entry)):
+                continue
+            usage = 0
+            if PROFILER.enabled and not dry_run:
+                with contextlib.suppress(OSError):
+                    usage = disk_usage_of(os.lstat(entry))
+            pending = len(denied)
+            if not remove_entry(entry, dry_run=dry_run, deferred=denied):
+                failed_entries[owner].append(str(entry))
+                continue
+            if len(denied) > pending:
+                owners[entry] = owner
+            else:
+                freed += usage
+                unlinks += 1
+            removed += 1
+        PROFILER.add_event(
+            "prune",
+            "path",
+            target_started,
+            time.perf_counter(),
+            path=str(owner),
+            bytes_freed=freed,
+            counters={"unlink": unlinks} if unlinks and not dry_run else {},
+        )
+
+    for entry in privileged_remove(denied):
+        failed_entries[owners[entry]].append(str(entry))
+        removed -= 1
+
+    return [(path, not failed_entries[path], failed_entries[path]) for path in paths], removed
+
+
+def engine_request(socket_path: Path, method: str, target: str, timeout: float) -> tuple[int, Any]:
+    import http.client
+    import json
+    import socket
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        sock.close()
+        raise
+    connection = http.client.HTTPConnection("localhost", timeout=timeout)
+    connection.sock = sock
+    try:
+        connection.request(method, target, headers={"Accept": "application/json"})
+        response = connection.getresponse()
+        body = response.read()
+    finally:
+        connection.close()
+    PROFILER.count("engine_request")
+    if "json" not in (response.getheader("Content-Type") or ""):
+        return response.status, body.decode("utf-8", "replace")
+    return response.status, json.loads(body or b"null")
+
+
+def engine_name(version: Any) -> str:
+    if isinstance(version, dict):
+        platform_info = version.get("Platform")
+        if isinstance(platform_info, dict) and platform_info.get("Name"):
+            return str(platform_info["Name"])
+        components = version.get("Components")
+        if isinstance(components, list) and components and isinstance(components[0], dict):
+            return str(components[0].get("Name", "Container-Engine"))
+    return "Container-Engine"
+
+
+def engine_reclaimable(usage: Any, targets: tuple[str, ...]) -> int:
+    if not isinstance(usage, dict):
+        return 0
+    total = 0
+    if "build_cache" in targets:
+        total += sum(
+            entry.get("Size", 0) for entry in usage.get("BuildCache") or [] if not entry.get("InUse")
+        )
+    if "images" in targets:
+        total += sum(
+            entry.get("Size", 0)
+            for entry in usage.get("Images") or []
+            if not entry.get("Containers") and entry.get("RepoTags") in (None, [], ["<none>:<none>"])
+        )
+    return total
+
+
+def prune_engine(socket_path: Path, targets: tuple[str, ...], dry_run: bool) -> dict[str, Any]:
+    import http.client
+
+    report: dict[str, Any] = {"socket": str(socket_path), "engine": None, "status": "down", "reclaimed_bytes": 0}
+    try:
+        status, version = engine_request(socket_path, "GET", "/version", ENGINE_PING_TIMEOUT)
+    except (ConnectionRefusedError, FileNotFoundError):
+        return report
+    except (OSError, http.client.HTTPException, ValueError) as exc:
+        print(f"[WARN] Container-Engine an {socket_path} nicht nutzbar: {exc}")
+        report["status"] = "error"
+        return report
+    if status != 200:
+        print(f"[WARN] Container-Engine an {socket_path} antwortet mit HTTP {status}")
+        report["status"] = "error"
+        return report
+
+    report["engine"] = engine_name(version)
+    report["status"] = "ok"
+    if dry_run:
+        try:
+            _status, usage = engine_request(socket_path, "GET", "/system/df", ENGINE_PRUNE_TIMEOUT)
+        except (OSError, http.client.HTTPException, ValueError):
+            usage = None
+        report["reclaimable_bytes"] = engine_reclaimable(usage, targets)
+        print(f"[DRY-RUN] prune {report['engine']} ({socket_path}): ~{format_bytes(report['reclaimable_bytes'])}")
+        return report
+
+    for target in targets:
+        try:
+            status, result = engine_request(socket_path, "POST", ENGINE_PRUNE_TARGETS[target], ENGINE_PRUNE_TIMEOUT)
+        except (OSError, http.client.HTTPException, ValueError) as exc:
+            status, result = 0, str(exc)
+        if status != 200 or not isinstance(result, dict):
+            message = result.get("message") if isinstance(result, dict) else result
+            print(f"[WARN] {report['engine']}: Prune {target} fehlgeschlagen ({status}): {message}")
+            report["status"] = "error"
+            continue
+        reclaimed = int(result.get("SpaceReclaimed") or 0)
+        deleted = result.get("CachesDeleted") if target == "build_cache" else result.get("ImagesDeleted")
+        report[target] = {"reclaimed_bytes": reclaimed, "deleted": len(deleted or [])}
+        report["reclaimed_bytes"] += reclaimed
+    return report
+
+
+def prune_engine_group(
+    paths: list[Path],
+    policy: EnginePolicy,
+    dry_run: bool,
+    engine: DeletionEngine,
+    keep: KeepRules | None = None,
+    stager: TrashStager | None = None,
+) -> tuple[list[tuple[Path, bool, list[str]]], list[dict[str, Any]]]:
+    reports: list[dict[str, Any]] = []
+    handled: dict[Path, str] = {}
+    for raw_socket, owned in policy.sockets:
+        socket_path = expand_path(raw_socket)
+        if not os.path.exists(socket_path):
+            continue
+        report = prune_engine(socket_path, policy.prune, dry_run)
+        if report["status"] == "down":
+            continue
+        reports.append(report)
+        owners = [expand_path(raw) for raw in owned]
+        for path in paths:
+            if any(path == owner or owner in path.parents for owner in owners):
+                handled.setdefault(path, report["status"])
+        if report["status"] == "ok" and not dry_run:
+            print(f"[OK] {report['engine']} ({socket_path}): {format_bytes(report['reclaimed_bytes'])} freigegeben")
+
+    raw_paths = [path for path in paths if path not in handled]
+    if not policy.raw_fallback:
+        for path in raw_paths:
+            print(f"[INFO] Übersprungen (keine Container-Engine erreichbar): {path}")
+        raw_paths = []
+    results = {
+        path: (path, path_ok, entries)
+        for path, path_ok, entries in clear_paths(raw_paths, dry_run=dry_run, engine=engine, keep=keep, stager=stager)
+    }
+    for path, status in handled.items():
+        results[path] = (path, status == "ok", [] if status == "ok" else [f"engine:{path}"])
+    return [results[path] for path in paths if path in results], reports
+
+
+@dataclass(frozen=True)
+class BudgetCandidate:
+    group_key: str
+    path: Path
+    size: int
+    bucket: int
+
+
+def order_by_priority(keys: list[str], priority: list[str]) -> list[str]:
+    ranked = [key for key in priority if key in keys]
+    return ranked + [key for key in keys if key not in ranked]
+
+
+def free_space(path: Path) -> int | None:
+    import shutil
+
+    try:
+        return shutil.disk_usage(path if path_exists(path) else path.parent).free
+    except OSError:
+        return None
+
+
+def budget_deficits(paths: list[Path], target_free: int | None, free_at_least: int | None) -> dict[int, int]:
+    if free_at_least is not None:
+        return {-1: free_at_least}
+
+    deficits: dict[int, int] = {}
+    for path in paths:
+        free = free_space(path)
+        try:
+            device = os.stat(path).st_dev
+        except OSError:
+            continue
+        if free is not None:
+            deficits[device] = max(0, (target_free or 0) - free)
+    return deficits
+
+
+def budget_candidates(
+    group_paths: dict[str, list[Path]],
+    sizes: dict[Path, int],
+    priority: list[str],
+    per_filesystem: bool,
+) -> list[BudgetCandidate]:
+    candidates: list[BudgetCandidate] = []
+    for group_key in order_by_priority(list(group_paths), priority):
+        ranked = sorted(group_paths[group_key], key=lambda path: sizes.get(path, 0), reverse=True)
+        for path in ranked:
+            size = sizes.get(path, 0)
+            if size <= 0:
+                continue
+            bucket = -1
+            if per_filesystem:
+                try:
+                    bucket = os.stat(path).st_dev
+                except OSError:
+                    continue
+            candidates.append(BudgetCandidate(group_key=group_key, path=path, size=size, bucket=bucket))
+    return candidates
+
+
+def plan_budget(candidates: list[BudgetCandidate], deficits: dict[int, int]) -> list[BudgetCandidate]:
+    remaining = dict(deficits)
+    plan: list[BudgetCandidate] = []
+    for candidate in candidates:
+        if all(value <= 0 for value in remaining.values()):
+            break
+        if remaining.get(candidate.bucket, 0) <= 0:
+            continue
+        plan.append(candidate)
+        remaining[candidate.bucket] -= candidate.size
+    return plan
+
+
+def run_budget_cleanup(
+    candidates: list[BudgetCandidate],
+    deficits: dict[int, int],
+    group_reports: dict[str, dict[str, Any]],
+    dry_run: bool,
+    engine: DeletionEngine,
+    style: CliStyle,
+    group_keep: dict[str, KeepRules | None] | None = None,
+    journal: DeletionJournal | None = None,
+    confirm: bool = False,
+    accounts: list[UserAccount] | None = None,
+) -> tuple[list[str], list[str], dict[str, Any]]:
+    plan = plan_budget(candidates, deficits)
+    cleaned: list[str] = []
+    failed: list[str] = []
+    remaining = dict(deficits)
+    freed_total = 0
+
+    print("\n" + style.subtitle("🎯 Budget-Plan"))
+    print(style.dim("-" * 40))
+    if not any(value > 0 for value in remaining.values()):
+        print(style.success("[OK] Ziel bereits erreicht, nichts zu löschen."))
+        return cleaned, failed, {"planned": [], "planned_bytes": 0, "freed_bytes": 0, "goal_met": True}
+    for candidate in plan:
+        print(f"  {style.accent('•')} [{candidate.group_key}] {candidate.path} (~{format_bytes(candidate.size)})")
+    planned = [
+        {"group": candidate.group_key, "path": str(candidate.path), "bytes": candidate.size} for candidate in plan
+    ]
+    planned_bytes = sum(candidate.size for candidate in plan)
+    if confirm and not ask_yes_no(f"Delete {len(plan)} planned path(s) (~{format_bytes(planned_bytes)})?"):
+        print(style.info("[INFO] Budget-Plan nicht ausgeführt."))
+        return cleaned, failed, {"planned": planned, "planned_bytes": planned_bytes, "freed_bytes": 0, "goal_met": False}
+
+    for candidate in plan if confirm else candidates:
+        if all(value <= 0 for value in remaining.values()):
+            break
+        if remaining.get(candidate.bucket, 0) <= 0:
+            continue
+
+        free_before = free_space(candidate.path)
+        keep = (group_keep or {}).get(candidate.group_key)
+        if journal is not None:
+            journal.plan(candidate.group_key, group_reports[candidate.group_key]["title"], [candidate.path],
+                         {str(candidate.path): candidate.size})
+        on_done = path_done_callback(candidate.group_key, dry_run, journal)
+        for path, path_ok, path_failed_entries in clean_as_owners(
+            [candidate.path],
+            accounts,
+            lambda paths, _account: clear_paths(paths, dry_run=dry_run, engine=engine, keep=keep, on_done=on_done),
+        ):
+            group_report = group_reports[candidate.group_key]
+            group_report["selected"] = True
+            group_report["action"] = "processed"
+            if path_ok:
+                cleaned.append(str(path))
+                group_report["cleaned"].append(str(path))
+            else:
+                failed.append(str(path))
+                group_report["failed"].append(str(path))
+            group_report["failed_entries"].extend(path_failed_entries)
+
+        freed = candidate.size
+        free_after = free_space(candidate.path)
+        if not dry_run and free_before is not None and free_after is not None:
+            freed = max(0, free_after - free_before)
+        remaining[candidate.bucket] -= freed
+        freed_total += freed
+
+    goal_met = all(value <= 0 for value in remaining.values())
+    summary = {
+        "planned": planned,
+        "planned_bytes": planned_bytes,
+        "freed_bytes": freed_total,
+        "goal_met": goal_met,
+    }
+    if goal_met:
+        print(style.success(f"[OK] Budget-Ziel erreicht ({format_bytes(freed_total)} freigegeben)."))
+    else:
+        print(style.warn(f"[WARN] Budget-Ziel nicht erreicht ({format_bytes(freed_total)} freigegeben)."))
+    return cleaned, failed, summary
+
+
+def hash_file(task: tuple[str, int | None]) -> tuple[str, str | None]:
+    import hashlib
+
+    path, limit = task
+    digest = hashlib.blake2b(digest_size=20)
+    remaining = limit
+    try:
+        with open(path, "rb") as handle:
+            while remaining is None or remaining > 0:
+                chunk = handle.read(DUPLICATE_HASH_CHUNK if remaining is None else min(DUPLICATE_HASH_CHUNK, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+    except OSError:
+        return path, None
+    return path, digest.hexdigest()
+
+
+def hash_files(tasks: list[tuple[str, int | None]], jobs: int) -> dict[str, str | None]:
+    if jobs <= 1 or len(tasks) <= DUPLICATE_SERIAL_LIMIT:
+        return dict(map(hash_file, tasks))
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return dict(pool.map(hash_file, tasks, chunksize=max(1, len(tasks) // (jobs * 8))))
+    except (OSError, NotImplementedError):
+        return dict(map(hash_file, tasks))
+
+
+def find_duplicates(roots: list[tuple[Path, KeepRules | None]], jobs: int) -> list[DuplicateSet]:
+    by_size: dict[int, dict[tuple[int, int], DuplicateFile]] = {}
+    for root, keep in roots:
+        for path, stat_result in iter_files(root, keep):
+            if stat_result.st_size == 0:
+                continue
+            by_size.setdefault(stat_result.st_size, {}).setdefault(
+                (stat_result.st_dev, stat_result.st_ino),
+                DuplicateFile(
+                    path, stat_result.st_dev, stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_nlink,
+                    stat_result.st_uid, stat_result.st_gid, stat_result.st_mode),
+            )
+
+    candidates = [(size, list(files.values())) for size, files in by_size.items() if len(files) > 1]
+    with PROFILER.span("hash_head"):
+        heads = hash_files(
+            [(entry.path, DUPLICATE_HEAD_BYTES) for _size, files in candidates for entry in files], jobs)
+    PROFILER.count("duplicate_head_hash", len(heads))
+
+    by_head: dict[tuple[int, str], list[DuplicateFile]] = {}
+    for size, files in candidates:
+        for entry in files:
+            head = heads.get(entry.path)
+            if head is not None:
+                by_head.setdefault((size, head), []).append(entry)
+
+    full_tasks = [
+        (entry.path, None)
+        for (size, _head), files in by_head.items()
+        if len(files) > 1 and size > DUPLICATE_HEAD_BYTES
+        for entry in files
+    ]
+    with PROFILER.span("hash_full"):
+        full = hash_files(full_tasks, jobs)
+    PROFILER.count("duplicate_full_hash", len(full))
+
+    by_digest: dict[tuple[int, str], list[DuplicateFile]] = {}
+    for (size, head), files in by_head.items():
+        if len(files) < 2:
+            continue
+        for entry in files:
+            digest = head if size <= DUPLICATE_HEAD_BYTES else full.get(entry.path)
+            if digest is not None:
+                by_digest.setdefault((size, digest), []).append(entry)
+
+    sets = [
+        DuplicateSet(size, digest, tuple(sorted(files, key=lambda entry: entry.path)))
+        for (size, digest), files in by_digest.items()
+        if len(files) > 1
+    ]
+    sets.sort(key=lambda duplicate: (-duplicate.reclaimable, duplicate.files[0].path))
+    return sets
+
+
+def hardlink_duplicates(sets: list[DuplicateSet], dry_run: bool) -> tuple[int, int, list[str]]:
+    linked = 0
+    saved = 0
+    failed: list[str] = []
+    for duplicate in sets:
+        by_owner: dict[tuple[int, int, int, int], list[DuplicateFile]] = {}
+        for entry in duplicate.files:
+            by_owner.setdefault((entry.device, entry.uid, entry.gid, entry.mode), []).append(entry)
+        for files in by_owner.values():
+            keeper = max(files, key=lambda entry: entry.links)
+            for entry in files:
+                if entry is keeper:
+                    continue
+                if dry_run:
+                    print(f"[DRY-RUN] hardlink: {entry.path} -> {keeper.path}")
+                    linked += 1
+                    saved += duplicate.size
+                    continue
+                temp = os.path.join(os.path.dirname(entry.path), f".{os.path.basename(entry.path)}.cache-cleaner-link")
+                try:
+                    current = os.lstat(entry.path)
+                    source = os.lstat(keeper.path)
+                    if (
+                        (current.st_ino, current.st_mtime_ns, current.st_size) != (entry.inode, entry.mtime_ns, duplicate.size)
+                        or (source.st_ino, source.st_mtime_ns) != (keeper.inode, keeper.mtime_ns)
+                        or (current.st_uid, current.st_gid, current.st_mode) != (entry.uid, entry.gid, entry.mode)
+                        or (source.st_uid, source.st_gid, source.st_mode) != (keeper.uid, keeper.gid, keeper.mode)
+                    ):
+                        print(f"[WARN] Seit dem Hashen geändert, nicht verlinkt: {entry.path}")
+                        failed.append(entry.path)
+                        continue
+                    os.link(keeper.path, temp)
+                    try:
+                        os.replace(temp, entry.path)
+                    except OSError:
+                        os.unlink(temp)
+                        raise
+                except OSError as exc:
+                    print(f"[WARN] Hardlink fehlgeschlagen: {entry.path} ({exc})")
+                    failed.append(entry.path)
+                    continue
+                PROFILER.count("hardlink")
+                linked += 1
+                saved += duplicate.size
+    return linked, saved, failed
+
+
+def print_duplicates(sets: list[DuplicateSet], style: CliStyle, limit: int | None) -> None:
+    print("\n" + style.subtitle("🔁 Duplikate"))
+    print(style.subtitle("-------------"))
+    print(f"{style.accent('•')} Gruppen: {len(sets)}")
+    print(f"{style.accent('•')} Doppelte Dateien: {sum(len(duplicate.files) - 1 for duplicate in sets)}")
+    print(f"{style.accent('•')} Einsparbar: {format_bytes(sum(duplicate.reclaimable for duplicate in sets))}")
+    shown = sets if limit is None else sets[:limit]
+    for duplicate in shown:
+        print(f"\n  {format_bytes(duplicate.size)} × {len(duplicate.files)} ({style.dim(duplicate.digest[:12])})")
+        for entry in duplicate.files:
+            print(f"    {entry.path}")
+    if len(shown) < len(sets):
+        print(style.dim(f"\n  … {len(sets) - len(shown)} weitere Gruppen (vollständig mit --export-report)"))
+
+
+class DeletionJournal:
+    def __init__(self, path: Path, meta: dict[str, Any], resume: bool = False) -> None:
+        self.path = path
+        self.meta = meta
+        self.resume = resume
+        self.handle: Any = None
+        self.pending = 0
+        self.synced_at = time.monotonic()
+        self.broken = False
+
+    def open_handle(self) -> None:
+        import json
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.handle = open(self.path, "a" if self.resume else "w", encoding="utf-8")
+        if not self.resume:
+            self.handle.write(json.dumps({"event": "start", "version": JOURNAL_VERSION, **self.meta}) + "\n")
+
+    def append(self, record: dict[str, Any], sync: bool = False) -> None:
+        import json
+
+        if self.broken:
+            return
+        try:
+            if self.handle is None:
+                self.open_handle()
+                sync = sync or not self.resume
+            self.handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.handle.flush()
+            self.pending += 1
+            if sync or self.pending >= JOURNAL_SYNC_RECORDS or time.monotonic() - self.synced_at >= JOURNAL_SYNC_SECONDS:
+                self.sync()
+        except OSError as exc:
+            self.broken = True
+            print(f"[WARN] Lösch-Journal deaktiviert ({self.path}): {exc}")
+
+    def sync(self) -> None:
+        os.fsync(self.handle.fileno())
+        PROFILER.count("journal_fsync")
+        self.pending = 0
+        self.synced_at = time.monotonic()
+
+    def plan(self, group_key: str, title: str, paths: list[Path], sizes: dict[str, int]) -> None:
+        self.append(
+            {
+                "event": "plan",
+                "group": group_key,
+                "title": title,
+                "paths": [str(path) for path in paths],
+                "sizes": {str(path): sizes.get(str(path), 0) for path in paths},
+            },
+            sync=True,
+        )
+
+    def recorder(self, group_key: str) -> Callable[[Path, bool, list[str]], None]:
+        def record(path: Path, ok: bool, failed_entries: list[str]) -> None:
+            self.append({"event": "done", "group": group_key, "path": str(path), "ok": ok,
+                         "failed_entries": failed_entries})
+
+        return record
+
+    def finish(self) -> None:
+        if self.handle is None:
+            return
+        self.append({"event": "finish"}, sync=True)
+        with contextlib.suppress(OSError):
+            self.handle.close()
+        self.handle = None
+
+
+def read_journal(path: Path) -> dict[str, Any] | None:
+    import json
+
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+
+    state: dict[str, Any] | None = None
+    offset = 0
+    for line in data.splitlines(keepends=True):
+        if not line.endswith(b"\n"):
+            break
+        try:
+            record = json.loads(line)
+            event = record["event"]
+            if event == "start":
+                if record.get("version") != JOURNAL_VERSION:
+                    return None
+                state = {"meta": record, "groups": {}, "done": {}, "finished": False}
+            elif state is None:
+                continue
+            elif event == "plan":
+                planned = state["groups"].setdefault(record["group"], {"title": record["title"], "paths": [], "sizes": {}})
+                planned["paths"] = list(dict.fromkeys([*planned["paths"], *record["paths"]]))
+                planned["sizes"].update(record["sizes"])
+            elif event == "done":
+                state["done"][(record["group"], record["path"])] = record
+            elif event == "finish":
+                state["finished"] = True
+        except (ValueError, TypeError, KeyError):
+            break
+        offset += len(line)
+    if state is not None:
+        state["valid_bytes"] = offset
+    return state
+
+
+def open_history(path: Path) -> Any:
+    import sqlite3
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=10)
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version not in (0, HISTORY_VERSION):
+        connection.close()
+        raise sqlite3.DatabaseError(f"unbekannte Schema-Version {version}")
+    connection.executescript(HISTORY_SCHEMA)
+    connection.execute(f"PRAGMA user_version = {HISTORY_VERSION}")
+    return connection
+
+
+def mount_point(path: Path) -> Path:
+    device = os.stat(path).st_dev
+    while path.parent != path:
+        try:
+            if os.stat(path.parent).st_dev != device:
+                break
+        except OSError:
+            break
+        path = path.parent
+    return path
+
+
+def prune_history(db: Any, now: int, retention_days: int) -> None:
+    cutoff = now - retention_days * 86400
+    db.execute("DELETE FROM samples WHERE ts < ?", (cutoff,))
+    db.execute("DELETE FROM filesystems WHERE ts < ?", (cutoff,))
+    for age, bucket in HISTORY_TIERS:
+        cutoff = now - age
+        db.execute(
+            "CREATE TEMP TABLE merged AS SELECT path_id, MAX(ts) AS ts, SUM(grown) AS grown, SUM(span) AS span "
+            "FROM samples WHERE ts < ? GROUP BY path_id, ts / ? HAVING COUNT(*) > 1",
+            (cutoff, bucket),
+        )
+        db.execute(
+            "UPDATE samples SET grown = merged.grown, span = merged.span FROM merged "
+            "WHERE samples.path_id = merged.path_id AND samples.ts = merged.ts"
+        )
+        db.execute(
+            "DELETE FROM samples WHERE ts < ? AND (path_id, ts / ?) IN (SELECT path_id, ts / ? FROM merged) "
+            "AND (path_id, ts) NOT IN (SELECT path_id, ts FROM merged)",
+            (cutoff, bucket, bucket),
+        )
+        db.execute("DROP TABLE merged")
+        db.execute(
+            "DELETE FROM filesystems WHERE ts < ? AND (device, ts) NOT IN "
+            "(SELECT device, MAX(ts) FROM filesystems WHERE ts < ? GROUP BY device, ts / ?)",
+            (cutoff, cutoff, bucket),
+        )
+    db.execute("DELETE FROM paths WHERE id NOT IN (SELECT DISTINCT path_id FROM samples)")
+
+
+def record_history(path: Path, report: dict[str, Any], now: int, retention_days: int) -> int:
+    import shutil
+    from contextlib import closing
+
+    dry_run = report["dry_run"]
+    rows: list[tuple[str, str, int, bool, int | None]] = []
+    filesystems: dict[int, tuple[str, int, int]] = {}
+    for group_report in report["groups"]:
+        for raw_path, size in group_report.get("paths_found_sizes", {}).items():
+            try:
+                device = os.stat(raw_path).st_dev
+                if device not in filesystems:
+                    usage = shutil.disk_usage(raw_path)
+                    filesystems[device] = (str(mount_point(Path(raw_path))), usage.free, usage.total)
+            except OSError:
+                device = None
+            cleaned = not dry_run and raw_path in group_report["cleaned"]
+            rows.append((group_report["key"], raw_path, size, cleaned, device))
+    if not rows:
+        return 0
+
+    with closing(open_history(path)) as db, db:
+        for group_key, raw_path, size, cleaned, device in rows:
+            db.execute(
+                "INSERT INTO paths (path, group_key, device) VALUES (?, ?, ?) ON CONFLICT (path) "
+                "DO UPDATE SET group_key = excluded.group_key, device = COALESCE(excluded.device, device)",
+                (raw_path, group_key, device),
+            )
+            path_id = db.execute("SELECT id FROM paths WHERE path = ?", (raw_path,)).fetchone()[0]
+            previous = db.execute(
+                "SELECT ts, bytes, cleaned FROM samples WHERE path_id = ? AND ts < ? ORDER BY ts DESC LIMIT 1",
+                (path_id, now),
+            ).fetchone()
+            grown = span = 0
+            if previous is not None:
+                grown = size - (0 if previous[2] else previous[1])
+                span = now - previous[0]
+            db.execute(
+                "INSERT OR REPLACE INTO samples (path_id, ts, bytes, cleaned, grown, span) VALUES (?, ?, ?, ?, ?, ?)",
+                (path_id, now, size, int(cleaned), grown, span),
+            )
+        db.executemany(
+            "INSERT OR REPLACE INTO filesystems (device, ts, mount, free, total) VALUES (?, ?, ?, ?, ?)",
+            [(device, now, mount, free, total) for device, (mount, free, total) in filesystems.items()],
+        )
+        prune_history(db, now, retention_days)
+    return len(rows)
+
+
+def history_trends(path: Path, now: int, window_days: int, group_keys: set[str] | None = None) -> dict[str, Any]:
+    from contextlib import closing
+
+    since = now - window_days * 86400
+    with closing(open_history(path)) as db:
+        path_rows = db.execute(
+            "SELECT p.group_key, p.path, p.device, SUM(s.grown), SUM(s.span), "
+            "(SELECT bytes FROM samples l WHERE l.path_id = p.id ORDER BY l.ts DESC LIMIT 1) "
+            "FROM samples s JOIN paths p ON p.id = s.path_id WHERE s.ts >= ? GROUP BY p.id ORDER BY p.path",
+            (since,),
+        ).fetchall()
+        filesystem_rows = db.execute(
+            "SELECT device, mount, free, total FROM filesystems f "
+            "WHERE ts = (SELECT MAX(ts) FROM filesystems l WHERE l.device = f.device) AND ts >= ?",
+            (since,),
+        ).fetchall()
+        runs = db.execute("SELECT COUNT(DISTINCT ts) FROM samples WHERE ts >= ?", (since,)).fetchone()[0]
+
+    filesystems = {
+        device: {"mount": mount, "free_bytes": free, "total_bytes": total, "growth_bytes_per_day": 0.0}
+        for device, mount, free, total in filesystem_rows
+    }
+    groups: dict[str, dict[str, Any]] = {}
+    for group_key, raw_path, device, grown, span, size in path_rows:
+        if group_keys is not None and group_key not in group_keys:
+            continue
+        rate = grown * 86400 / span if span else 0.0
+        group = groups.setdefault(group_key, {"bytes": 0, "growth_bytes_per_day": 0.0, "devices": {}, "paths": []})
+        group["bytes"] += size
+        group["growth_bytes_per_day"] += rate
+        group["paths"].append({"path": raw_path, "bytes": size, "growth_bytes_per_day": rate})
+        if device in filesystems:
+            group["devices"][device] = group["devices"].get(device, 0.0) + rate
+            filesystems[device]["growth_bytes_per_day"] += rate
+
+    def days_to_full(free: int, rate: float) -> float | None:
+        return round(free / rate, 1) if rate > 0 else None
+
+    for group in groups.values():
+        estimates = [
+            days for device, rate in group.pop("devices").items()
+            if (days := days_to_full(filesystems[device]["free_bytes"], rate)) is not None
+        ]
+        group["days_to_full"] = min(estimates, default=None)
+    for filesystem in filesystems.values():
+        filesystem["days_to_full"] = days_to_full(filesystem["free_bytes"], filesystem["growth_bytes_per_day"])
+
+    return {
+        "window_days": window_days,
+        "runs": runs,
+        "groups": dict(sorted(groups.items(), key=lambda item: -item[1]["growth_bytes_per_day"])),
+        "filesystems": {str(device): filesystem for device, filesystem in filesystems.items()},
+    }
+
+
+def path_done_callback(
+    group_key: str, dry_run: bool, journal: DeletionJournal | None
+) -> Callable[[Path, bool, list[str]], None] | None:
+    record = journal.recorder(group_key) if journal is not None else None
+    if record is None and not EVENTS.enabled:
+        return None
+
+    def on_done(path: Path, ok: bool, failed_entries: list[str]) -> None:
+        EVENTS.emit(
+            "path_removed" if ok else "path_failed",
+            group=group_key,
+            path=str(path),
+            dry_run=dry_run,
+            failed_entries=failed_entries,
+        )
+        if record is not None:
+            record(path, ok, failed_entries)
+
+    return on_done
+
+
+def clean_group(
+    group: CacheGroup,
+    paths: list[Path],
+    dry_run: bool,
+    engine: DeletionEngine,
+    group_report: dict[str, Any],
+    keep: KeepRules | None = None,
+    on_done: Callable[[Path, bool, list[str]], None] | None = None,
+    stager: TrashStager | None = None,
+) -> list[tuple[Path, bool, list[str]]]:
+    if group.pacman is None and group.evict is None and group.engine is None:
+        return clear_paths(paths, dry_run=dry_run, engine=engine, keep=keep, on_done=on_done, stager=stager)
+
+    if group.engine is not None:
+        results, engines = prune_engine_group(
+            paths, group.engine, dry_run=dry_run, engine=engine, keep=keep, stager=stager)
+        group_report.setdefault("engines", []).extend(engines)
+        group_report["engine_reclaimed_bytes"] = group_report.get("engine_reclaimed_bytes", 0) + sum(
+            report["reclaimed_bytes"] for report in engines
+        )
+    elif group.pacman is not None:
+        results, pacman_removed = prune_pacman_group(paths, group.pacman, dry_run=dry_run, engine=engine, keep=keep)
+        group_report["pacman_removed"] = group_report.get("pacman_removed", 0) + pacman_removed
+    else:
+        results, evicted_files, evicted_bytes = evict_group(paths, group.evict, dry_run=dry_run, keep=keep)
+        group_report["evicted_files"] = group_report.get("evicted_files", 0) + evicted_files
+        group_report["evicted_bytes"] = group_report.get("evicted_bytes", 0) + evicted_bytes
+    if on_done is not None:
+        for path, path_ok, path_failed_entries in results:
+            on_done(path, path_ok, path_failed_entries)
+    return results
+
+
+def print_group_preview(
+    group: CacheGroup,
+    resolved_paths: list[Path],
+    quiet: bool,
+    style: CliStyle,
+    sizes: dict[Path, int],
+) -> tuple[int, int]:
+    if not resolved_paths:
+        if not quiet:
+            print(style.dim(f"[INFO] {group.title}: nichts gefunden"))
+        return 0, 0
+
+    print("\n" + style.subtitle(f"✨ {group.title}"))
+    print(style.dim("-" * 40))
+    total_bytes = 0
+    for path in resolved_paths:
+        path_size = sizes[path]
+        size = format_bytes(path_size)
+        total_bytes += path_size
+        print(f"  {style.accent('•')} {path} ({size})")
+    return len(resolved_paths), total_bytes
+
+
+class LiveGroupPreview:
+    def __init__(
+        self,
+        group: CacheGroup,
+        paths: list[Path],
+        style: CliStyle,
+        futures: dict[Path, Future[int]],
+        live: bool,
+    ) -> None:
+        self.group = group
+        self.paths = paths
+        self.style = style
+        self.futures = futures
+        self.live = live
+        self.active = False
+        self.prompt_rows = 0
+        self.rendered: set[int] = set()
+        self.lock = threading.Lock()
+
+    def line(self, path: Path, size: int | None) -> str:
+        label = format_bytes(size) if size is not None else "scanne …"
+        return f"  {self.style.accent('•')} {path} ({label})"
+
+    def show(self) -> None:
+        import shutil
+
+        print("\n" + self.style.subtitle(f"✨ {self.group.title}"))
+        print(self.style.dim("-" * 40))
+        columns = shutil.get_terminal_size().columns
+        self.prompt_rows = len(f"{self.group.prompt} [y/N]: ") // columns
+        if not self.live or any(len(f"  • {path} (999.9 MB)") >= columns for path in self.paths):
+            for index, path in enumerate(self.paths):
+                print(self.line(path, self.futures[path].result()))
+                self.rendered.add(index)
+            return
+
+        for index, path in enumerate(self.paths):
+            future = self.futures[path]
+            if future.done():
+                print(self.line(path, future.result()))
+                self.rendered.add(index)
+            else:
+                print(self.line(path, None))
+        sys.stdout.flush()
+        self.active = True
+        for index, path in enumerate(self.paths):
+            if index not in self.rendered:
+                self.futures[path].add_done_callback(lambda future, index=index: self.update(index, future))
+
+    def update(self, index: int, future: Future[int]) -> None:
+        with self.lock:
+            if not self.active or index in self.rendered or future.exception() is not None:
+                return
+            lines_up = len(self.paths) - index + self.prompt_rows
+            line = self.line(self.paths[index], future.result())
+            sys.stdout.write(f"\0337\033[{lines_up}A\r\033[2K{line}\0338")
+            sys.stdout.flush()
+            self.rendered.add(index)
+
+    def detach(self) -> None:
+        with self.lock:
+            self.active = False
+
+    def finish(self) -> int:
+        self.detach()
+        total = sum(self.futures[path].result() for path in self.paths)
+        if len(self.rendered) < len(self.paths):
+            print(self.style.dim(f"  Σ {format_bytes(total)}"))
+        return total
+
+
+class UsageTree:
+    def __init__(self) -> None:
+        from array import array
+
+        self.names: list[str] = []
+        self.parents = array("q")
+        self.sizes = array("Q")
+        self.child_start = array("q")
+        self.child_count = array("l")
+        self.groups: dict[int, str] = {}
+        self.roots: dict[int, tuple[str, Path]] = {}
+
+    def add(self, name: str, parent: int, size: int, is_dir: bool) -> int:
+        self.names.append(sys.intern(name))
+        self.parents.append(parent)
+        self.sizes.append(size)
+        self.child_start.append(0 if is_dir else -1)
+        self.child_count.append(0)
+        return len(self.names) - 1
+
+    @classmethod
+    def scan(cls, groups: dict[str, CacheGroup], group_paths: dict[str, list[Path]]) -> UsageTree:
+        from collections import deque
+
+        tree = cls()
+        tree.add("/", -1, 0, True)
+        tree.child_start[0] = 1
+        for group_key, group in groups.items():
+            tree.groups[tree.add(group.title, 0, 0, True)] = group_key
+            tree.child_count[0] += 1
+
+        seen_links: set[tuple[int, int]] = set()
+        pending: deque[tuple[int, str]] = deque()
+
+        def add_entry(name: str, parent: int, stat_result: os.stat_result, path: str) -> int:
+            usage = disk_usage_of(stat_result)
+            is_dir = stat.S_ISDIR(stat_result.st_mode)
+            if not is_dir and stat_result.st_nlink > 1:
+                identity = (stat_result.st_dev, stat_result.st_ino)
+                if identity in seen_links:
+                    usage = 0
+                seen_links.add(identity)
+            node = tree.add(name, parent, usage, is_dir)
+            if is_dir:
+                pending.append((node, path))
+            return node
+
+        for group_node, group_key in tree.groups.items():
+            tree.child_start[group_node] = len(tree.names)
+            for path in group_paths.get(group_key, []):
+                try:
+                    stat_result = os.lstat(path)
+                except OSError:
+                    continue
+                tree.roots[add_entry(str(path), group_node, stat_result, str(path))] = (group_key, path)
+                tree.child_count[group_node] += 1
+
+        while pending:
+            node, path = pending.popleft()
+            tree.child_start[node] = len(tree.names)
+            PROFILER.count("scan_listdir")
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        PROFILER.count("scan_stat")
+                        try:
+                            stat_result = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        add_entry(entry.name, node, stat_result, entry.path)
+                        tree.child_count[node] += 1
+            except OSError:
+                continue
+
+        for node in range(len(tree.names) - 1, 0, -1):
+            tree.sizes[tree.parents[node]] += tree.sizes[node]
+        return tree
+
+    def is_dir(self, node: int) -> bool:
+        return self.child_start[node] >= 0
+
+    def path_of(self, node: int) -> Path:
+        parts: list[str] = []
+        while node not in self.roots:
+            parts.append(self.names[node])
+            node = self.parents[node]
+        return self.roots[node][1].joinpath(*reversed(parts))
+
+    def group_of(self, node: int) -> str:
+        while node not in self.groups:
+            node = self.parents[node]
+        return self.groups[node]
+
+    def children(self, node: int, limit: int) -> tuple[list[int], int, int]:
+        import heapq
+
+        if not self.is_dir(node):
+            return [], 0, 0
+        start = self.child_start[node]
+        nodes = range(start, start + self.child_count[node])
+        top = heapq.nlargest(limit, nodes, key=self.sizes.__getitem__)
+        hidden = len(nodes) - len(top)
+        return top, hidden, sum(self.sizes[child] for child in nodes) - sum(self.sizes[child] for child in top)
+
+    def label(self, node: int) -> str:
+        if node == 0:
+            return "Gruppen"
+        if node in self.groups or node in self.roots:
+            return self.names[node]
+        return str(self.path_of(node))
+
+    def marked_roots(self, marked: set[int]) -> list[int]:
+        selected: list[int] = []
+        for node in sorted(marked):
+            parent = self.parents[node]
+            while parent >= 0 and parent not in marked:
+                parent = self.parents[parent]
+            if parent < 0:
+                selected.append(node)
+        return selected
+
+
+def explore_ui(screen: Any, tree: UsageTree) -> list[int]:
+    import curses
+
+    with contextlib.suppress(curses.error):
+        curses.curs_set(0)
+    screen.keypad(True)
+    marked: set[int] = set()
+    trail: list[tuple[int, int]] = []
+    node = 0
+    cursor = 0
+    offset = 0
+    while True:
+        children, hidden, hidden_size = tree.children(node, EXPLORE_TOP_K)
+        cursor = max(0, min(cursor, len(children) - 1))
+        height, width = screen.getmaxyx()
+        rows = max(1, height - 3)
+        if cursor < offset:
+            offset = cursor
+        elif cursor >= offset + rows:
+            offset = cursor - rows + 1
+
+        screen.erase()
+        header = f" {tree.label(node)}  ({format_bytes(tree.sizes[node])})"
+        screen.addnstr(0, 0, header.ljust(width), width - 1, curses.A_REVERSE)
+        largest = max((tree.sizes[child] for child in children), default=0) or 1
+        for row, child in enumerate(children[offset:offset + rows]):
+            filled = round(EXPLORE_BAR_WIDTH * tree.sizes[child] / largest)
+            name = tree.names[child] + ("/" if tree.is_dir(child) and child not in tree.groups else "")
+            line = (
+                f"{'*' if child in marked else ' '} {format_bytes(tree.sizes[child]):>10} "
+                f"[{'#' * filled:<{EXPLORE_BAR_WIDTH}}] {name}"
+            )
+            attributes = curses.A_REVERSE if offset + row == cursor else curses.A_NORMAL
+            screen.addnstr(1 + row, 0, line, width - 1, attributes | (curses.A_BOLD if child in marked else 0))
+        if hidden and len(children) - offset < rows:
+            screen.addnstr(1 + len(children) - offset, 0, f"  … {hidden} weitere Einträge ({format_bytes(hidden_size)})",
+                           width - 1, curses.A_DIM)
+        marked_size = sum(tree.sizes[item] for item in tree.marked_roots(marked))
+        footer = (
+            f" ↑↓ wählen  → öffnen  ← zurück  Leertaste markieren  d löschen  q abbrechen"
+            f"  | markiert: {len(marked)} ({format_bytes(marked_size)})"
+        )
+        screen.addnstr(height - 1, 0, footer.ljust(width), width - 1, curses.A_REVERSE)
+        screen.refresh()
+
+        key = screen.getch()
+        if key in (curses.KEY_UP, ord("k")):
+            cursor -= 1
+        elif key in (curses.KEY_DOWN, ord("j")):
+            cursor += 1
+        elif key == curses.KEY_PPAGE:
+            cursor -= rows
+        elif key == curses.KEY_NPAGE:
+            cursor += rows
+        elif key in (curses.KEY_HOME, ord("g")):
+            cursor = 0
+        elif key in (curses.KEY_END, ord("G")):
+            cursor = len(children) - 1
+        elif key in (curses.KEY_RIGHT, ord("l"), ord("\n"), curses.KEY_ENTER) and children:
+            if tree.is_dir(children[cursor]) and tree.child_count[children[cursor]]:
+                trail.append((node, cursor))
+                node, cursor, offset = children[cursor], 0, 0
+        elif key in (curses.KEY_LEFT, ord("h"), curses.KEY_BACKSPACE, 127) and trail:
+            node, cursor = trail.pop()
+            offset = 0
+        elif key == ord(" ") and children:
+            child = children[cursor]
+            if child not in tree.groups:
+                marked.symmetric_difference_update({child})
+            cursor += 1
+        elif key == ord("d"):
+            return tree.marked_roots(marked)
+        elif key in (ord("q"), 27):
+            return []
+
+
+def temp_roots(platform_key: str) -> list[Path]:
+    import tempfile
+
+    if platform_key == "win32":
+        roots = [tempfile.gettempdir()]
+        for key in ("TMP", "TEMP"):
+            value = os.environ.get(key)
+            if value:
+                roots.append(value)
+        roots.append(r"C:\\Windows\\Temp")
+        unique = []
+        seen = set()
+        for root in roots:
+            path = Path(root).resolve(strict=False)
+            if str(path).lower() not in seen:
+                seen.add(str(path).lower())
+                unique.append(path)
+        return unique
+
+    return [Path("/tmp"), Path("/var/tmp")]
+
+
+def iter_temp_entries(
+    root: Path, cutoff: float, age_field: str, slots: threading.Semaphore
+) -> Iterator[TempEntry]:
+    attribute = f"st_{age_field}"
+    fd_safe = os.open in os.supports_dir_fd and os.scandir in os.supports_fd and hasattr(os, "O_NOFOLLOW")
+    try:
+        root_fd = os.open(root, os.O_RDONLY | os.O_DIRECTORY) if fd_safe else None
+    except OSError:
+        return
+    try:
+        root_device = os.lstat(root).st_dev if root_fd is None else os.fstat(root_fd).st_dev
+        root_entries = os.scandir(root if root_fd is None else root_fd)
+    except OSError:
+        if root_fd is not None:
+            os.close(root_fd)
+        return
+
+    stack: list[tuple[TempEntry, Iterator[os.DirEntry[str]]]] = [
+        (TempEntry("root", str(root), str(root), None, root_fd), root_entries)
+    ]
+    try:
+        while stack:
+            current, entries = stack[-1]
+            try:
+                entry = next(entries, None)
+            except OSError:
+                entry = None
+            if entry is None:
+                stack.pop()
+                entries.close()
+                slots.acquire()
+                yield current
+                continue
+
+            path = os.path.join(current.path, entry.name)
+            PROFILER.count("temp_stat")
+            try:
+                stat_result = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+
+            if stat.S_ISDIR(stat_result.st_mode):
+                if stat_result.st_dev != root_device:
+                    continue
+                PROFILER.count("temp_listdir")
+                if current.fd is None:
+                    try:
+                        stack.append((TempEntry("dir", path, path, None), os.scandir(path)))
+                    except OSError:
+                        pass
+                    continue
+                try:
+                    fd = os.open(entry.name, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW, dir_fd=current.fd)
+                except OSError:
+                    continue
+                try:
+                    opened = os.fstat(fd)
+                    same = (opened.st_dev, opened.st_ino) == (stat_result.st_dev, stat_result.st_ino)
+                    children = os.scandir(fd) if same else None
+                except OSError:
+                    children = None
+                if children is None:
+                    os.close(fd)
+                    continue
+                stack.append((TempEntry("dir", path, entry.name, current.fd, fd), children))
+                continue
+
+            if not (stat.S_ISREG(stat_result.st_mode) or stat.S_ISLNK(stat_result.st_mode)):
+                continue
+            if getattr(stat_result, attribute) < cutoff:
+                yield TempEntry("file", path, path if current.fd is None else entry.name, current.fd)
+    finally:
+        for current, entries in stack:
+            entries.close()
+            if current.fd is not None:
+                os.close(current.fd)
+
+
+def drain_temp_queue(
+    work: queue.Queue[TempEntry | None],
+    dry_run: bool,
+    denied: list[Path],
+    failed: list[str],
+    removed: list[int],
+    slots: threading.Semaphore,
+) -> None:
+    removed_in: dict[str, int] = {}
+    while True:
+        item = work.get()
+        if item is None:
+            return
+        parent = os.path.dirname(item.path)
+
+        if item.kind != "file":
+            try:
+                if item.kind != "dir" or dry_run or not removed_in.pop(item.path, 0):
+                    continue
+                try:
+                    os.rmdir(item.name, dir_fd=item.parent_fd)
+                except OSError:
+                    continue
+                PROFILER.count("rmdir")
+                removed_in[parent] = removed_in.get(parent, 0) + 1
+            finally:
+                if item.fd is not None:
+                    os.close(item.fd)
+                slots.release()
+            continue
+
+        if dry_run:
+            print(f"[DRY-RUN] remove: {item.path}")
+            EVENTS.emit("temp_entry_removed", path=item.path, dry_run=True)
+            removed[0] += 1
+            continue
+        try:
+            os.unlink(item.name, dir_fd=item.parent_fd)
+        except FileNotFoundError:
+            continue
+        except PermissionError:
+            denied.append(Path(item.path))
+            continue
+        except OSError:
+            print(f"[WARN] Löschen fehlgeschlagen: {item.path}")
+            failed.append(item.path)
+            continue
+        PROFILER.count("unlink")
+        EVENTS.emit("temp_entry_removed", path=item.path, dry_run=False)
+        removed[0] += 1
+        removed_in[parent] = removed_in.get(parent, 0) + 1
+
+
+def clean_temp_older_than(
+    days: int, platform_key: str, dry_run: bool, age_field: str = "mtime"
+) -> tuple[list[str], list[str]]:
+    import queue
+
+    cleaned: list[str] = []
+    failed: list[str] = []
+    cutoff = datetime.now().timestamp() - days * 86400
+
+    for root in temp_roots(platform_key):
+        if not root.exists() or not root.is_dir():
+            continue
+
+        denied: list[Path] = []
+        removed = [0]
+        slots = threading.Semaphore(DELETE_OPEN_DIRS)
+        work: queue.Queue[TempEntry | None] = queue.Queue(maxsize=TEMP_QUEUE_SIZE)
+        worker = threading.Thread(
+            target=drain_temp_queue, args=(work, dry_run, denied, failed, removed, slots), daemon=True)
+        worker.start()
+        try:
+            for item in iter_temp_entries(root, cutoff, age_field, slots):
+                work.put(item)
+        finally:
+            work.put(None)
+            worker.join()
+
+        nested = [entry for entry in denied if entry.parent != root]
+        for entry in nested:
+            print(f"[WARN] Keine Rechte für: {entry}")
+        failed.extend(str(entry) for entry in nested)
+        denied = [entry for entry in denied if entry.parent == root]
+        denied_failed = privileged_remove(denied)
+        failed.extend(f"{entry}" for entry in denied_failed)
+        for entry in set(denied).difference(denied_failed):
+            EVENTS.emit("temp_entry_removed", path=str(entry), dry_run=False)
+        if removed[0] or len(denied_failed) < len(denied):
+            cleaned.append(f"{root} (älter als {days} Tage)")
+
+    return cleaned, failed
+
+
+class Inotify:
+    def __init__(self) -> None:
+        import ctypes
+        import struct
+
+        self._ctypes = ctypes
+        self._event = struct.Struct("iIII")
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.fd = fd
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self._ctypes.c_uint32(mask))
+        if wd < 0:
+            error = self._ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        return wd
+
+    def remove_watch(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self, timeout: float | None) -> list[tuple[int, int]]:
+        import select
+
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        events: list[tuple[int, int]] = []
+        if not readable:
+            return events
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _cookie, length = self._event.unpack_from(buffer, offset)
+                events.append((wd, mask))
+                offset += self._event.size + length
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def read_directory_usage(path: str) -> tuple[int, set[str]]:
+    usage = 0
+    children: set[str] = set()
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                stat_result = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            usage += disk_usage_of(stat_result)
+            if stat.S_ISDIR(stat_result.st_mode):
+                children.add(entry.path)
+    return usage, children
+
+
+class WatchTracker:
+    def __init__(self, inotify: Inotify, style: CliStyle) -> None:
+        self.inotify = inotify
+        self.style = style
+        self.roots: dict[str, list[str]] = {}
+        self.totals: dict[str, int] = {}
+        self.dirs: dict[str, tuple[str, int, set[str]]] = {}
+        self.watches: dict[int, str] = {}
+        self.watch_ids: dict[str, int] = {}
+        self.limit_reached = False
+
+    def add_group(self, group_key: str, paths: list[Path]) -> None:
+        self.roots[group_key] = [str(path) for path in paths]
+        self.totals[group_key] = 0
+        for root in self.roots[group_key]:
+            self.add_tree(group_key, root)
+
+    def watch(self, path: str) -> None:
+        if self.limit_reached:
+            return
+        try:
+            wd = self.inotify.add_watch(path, WATCH_MASK)
+        except OSError as exc:
+            if exc.errno == errno.ENOSPC:
+                self.limit_reached = True
+                print(self.style.warn(
+                    "[WARN] inotify-Limit erreicht (fs.inotify.max_user_watches), weitere Verzeichnisse werden "
+                    "nicht überwacht."))
+            return
+        self.watches[wd] = path
+        self.watch_ids[path] = wd
+
+    def add_tree(self, group_key: str, root: str) -> None:
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            if path in self.dirs:
+                continue
+            self.watch(path)
+            try:
+                usage, children = read_directory_usage(path)
+            except OSError:
+                self.unwatch(path)
+                continue
+            self.dirs[path] = (group_key, usage, children)
+            self.totals[group_key] += usage
+            stack.extend(children)
+
+    def unwatch(self, path: str) -> None:
+        wd = self.watch_ids.pop(path, None)
+        if wd is not None:
+            self.watches.pop(wd, None)
+            self.inotify.remove_watch(wd)
+
+    def drop_tree(self, root: str) -> None:
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            entry = self.dirs.pop(path, None)
+            if entry is None:
+                continue
+            group_key, usage, children = entry
+            self.totals[group_key] -= usage
+            self.unwatch(path)
+            stack.extend(children)
+
+    def rescan(self, path: str) -> None:
+        entry = self.dirs.get(path)
+        if entry is None:
+            return
+        group_key, usage, children = entry
+        try:
+            new_usage, new_children = read_directory_usage(path)
+        except OSError:
+            self.drop_tree(path)
+            return
+        self.dirs[path] = (group_key, new_usage, new_children)
+        self.totals[group_key] += new_usage - usage
+        for child in children - new_children:
+            self.drop_tree(child)
+        for child in new_children - children:
+            self.add_tree(group_key, child)
+
+    def resync(self, group_key: str) -> None:
+        for root in self.roots[group_key]:
+            self.drop_tree(root)
+        self.totals[group_key] = 0
+        for root in self.roots[group_key]:
+            if os.path.isdir(root):
+                self.add_tree(group_key, root)
+
+
+def watch_groups(
+    groups: dict[str, CacheGroup],
+    group_paths: dict[str, list[Path]],
+    default_max_bytes: int | None,
+    cooldown: float,
+    dry_run: bool,
+    engine: DeletionEngine,
+    style: CliStyle,
+    group_keep: dict[str, KeepRules | None] | None = None,
+    accounts: list[UserAccount] | None = None,
+) -> int:
+    import signal
+
+    try:
+        inotify = Inotify()
+    except (OSError, AttributeError) as exc:
+        print(style.error(f"[ERROR] inotify nicht verfügbar, --watch wird nicht unterstützt: {exc}"))
+        return 1
+
+    limits: dict[str, int] = {}
+    for group_key, group in groups.items():
+        max_bytes = group.watch.max_bytes if group.watch is not None else default_max_bytes
+        if max_bytes is not None and group_paths[group_key]:
+            limits[group_key] = max_bytes
+    if not limits:
+        inotify.close()
+        print(style.error("[ERROR] Keine Gruppe mit Größenlimit (watch.max_bytes oder --watch-max) und vorhandenen Pfaden."))
+        return 1
+
+    tracker = WatchTracker(inotify, style)
+    print("\n" + style.subtitle("👀 Watch-Modus"))
+    print(style.dim("-" * 40))
+    for group_key, max_bytes in limits.items():
+        tracker.add_group(group_key, group_paths[group_key])
+        print(
+            f"  {style.accent('•')} {groups[group_key].title}: "
+            f"{format_bytes(tracker.totals[group_key])} / {format_bytes(max_bytes)}"
+        )
+    print(style.info(f"[INFO] {len(tracker.watches)} Verzeichnisse überwacht. Beenden mit Strg+C."))
+
+    def stop(_signum: int, _frame: Any) -> None:
+        raise KeyboardInterrupt
+
+    previous_handler = signal.signal(signal.SIGTERM, stop)
+    last_cleanup: dict[str, float] = {}
+    dirty: set[str] = set()
+    settle_deadline: float | None = None
+    try:
+        while True:
+            timeout = None if settle_deadline is None else max(0.0, settle_deadline - time.monotonic())
+            for wd, mask in inotify.read_events(timeout):
+                if mask & IN_Q_OVERFLOW:
+                    print(style.warn("[WARN] inotify-Warteschlange übergelaufen, zähle neu."))
+                    for group_key in limits:
+                        tracker.resync(group_key)
+                    dirty.clear()
+                    continue
+                path = tracker.watches.get(wd)
+                if path is None:
+                    continue
+                if mask & IN_IGNORED:
+                    tracker.watches.pop(wd, None)
+                    tracker.watch_ids.pop(path, None)
+                dirty.add(path)
+            if dirty and settle_deadline is None:
+                settle_deadline = time.monotonic() + WATCH_SETTLE_SECONDS
+            if settle_deadline is None or time.monotonic() < settle_deadline:
+                continue
+
+            for path in sorted(dirty):
+                tracker.rescan(path)
+            dirty.clear()
+            settle_deadline = None
+
+            now = time.monotonic()
+            for group_key, max_bytes in limits.items():
+                total = tracker.totals[group_key]
+                if total <= max_bytes or now - last_cleanup.get(group_key, -cooldown) < cooldown:
+                    continue
+                group = groups[group_key]
+                print(style.warn(
+                    f"[WARN] {group.title}: {format_bytes(total)} überschreitet Limit {format_bytes(max_bytes)}, "
+                    "starte Bereinigung."))
+                group_report: dict[str, Any] = {}
+                results = clean_as_owners(
+                    group_paths[group_key],
+                    accounts,
+                    lambda paths, _account: clean_group(group, paths, dry_run=dry_run, engine=engine,
+                                                        group_report=group_report,
+                                                        keep=(group_keep or {}).get(group_key)),
+                )
+                failed_paths = [path for path, path_ok, _entries in results if not path_ok]
+                last_cleanup[group_key] = time.monotonic()
+                tracker.resync(group_key)
+                if failed_paths:
+                    print(style.warn(
+                        f"[WARN] {group.title}: {len(failed_paths)} Pfade nicht vollständig bereinigt, "
+                        f"jetzt {format_bytes(tracker.totals[group_key])}."))
+                else:
+                    print(style.success(f"[OK] {group.title}: jetzt {format_bytes(tracker.totals[group_key])}."))
+    except KeyboardInterrupt:
+        print("\n" + style.info("[INFO] Watch-Modus beendet."))
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        inotify.close()
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Interaktiver Multi-Platform Cache-Cleaner")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Nur anzeigen, nichts löschen")
+    parser.add_argument("--quiet", action="store_true", help="Weniger Ausgabe")
+    parser.add_argument(
+        "--yes",
+        action="store_true",
+        help="Alle gefundenen Gruppen ohne Rückfrage bereinigen (außer Temp, wenn --temp-days nicht gesetzt)",
+    )
+    parser.add_argument(
+        "--only",
+        default=None,
+        help="Nur bestimmte Gruppen-Keys ausführen (kommagetrennt, z. B. install,aur_build)",
+    )
+    parser.add_argument(
+        "--list-groups",
+        action="store_true",
+        help="Nur verfügbare Gruppen und vorhandene Pfade anzeigen, dann beenden",
+    )
+    parser.add_argument(
+        "--no-temp",
+        action="store_true",
+        help="Temporäre Bereinigung überspringen",
+    )
+    parser.add_argument(
+        "--temp-days",
+        type=int,
+        default=None,
+        help="Temp-Dateien älter als N Tage bereinigen (ohne Nachfrage für Temp)",
+    )
+    parser.add_argument(
+        "--temp-age-field",
+        choices=TEMP_AGE_FIELDS,
+        default="mtime",
+        help="Zeitstempel für das Temp-Alter pro Datei: mtime, atime oder ctime",
+    )
+    parser.add_argument(
+        "--config",
+        default=None,
+        help="Pfad zu JSON-Datei mit Cache-Profilen",
+    )
+    parser.add_argument(
+        "--export-report",
+        default=None,
+        help="JSON-Report in diese Datei schreiben",
+    )
+    budget = parser.add_mutually_exclusive_group()
+    budget.add_argument(
+        "--free-at-least",
+        type=parse_size,
+        default=None,
+        metavar="SIZE",
+        help="Budget-Modus: nur so viele Pfade bereinigen, bis mindestens SIZE freigegeben ist (z. B. 5G)",
+    )
+    budget.add_argument(
+        "--target-free",
+        type=parse_size,
+        default=None,
+        metavar="SIZE",
+        help="Budget-Modus: bereinigen, bis auf jedem betroffenen Dateisystem SIZE frei ist (z. B. 20G)",
+    )
+    parser.add_argument(
+        "--priority",
+        default=None,
+        help="Gruppen-Reihenfolge für den Budget-Modus (kommagetrennt, Rest in Config-Reihenfolge)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_DELETE_JOBS,
+        help=f"Parallele Lösch-Worker pro Dateisystem (Standard: {DEFAULT_DELETE_JOBS})",
+    )
+    parser.add_argument(
+        "--trends",
+        type=int,
+        nargs="?",
+        const=DEFAULT_TRENDS_DAYS,
+        default=None,
+        metavar="DAYS",
+        help=f"Wachstum pro Gruppe/Dateisystem und Tage bis voll aus dem Verlauf (Standard: {DEFAULT_TRENDS_DAYS} Tage)",
+    )
+    parser.add_argument(
+        "--history-db",
+        default=None,
+        help="Pfad der Verlaufs-Datenbank (Standard: $XDG_CACHE_HOME/arch-cache-cleaner/history.sqlite3)",
+    )
+    parser.add_argument(
+        "--history-days",
+        type=int,
+        default=DEFAULT_HISTORY_DAYS,
+        help=f"Verlauf so viele Tage aufbewahren (Standard: {DEFAULT_HISTORY_DAYS}, ältere Daten verdichtet)",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="Größen dieses Laufs nicht in die Verlaufs-Datenbank schreiben",
+    )
+    parser.add_argument(
+        "--explore",
+        action="store_true",
+        help="Interaktiver Speicher-Explorer (curses): Gruppenpfade durchsuchen und Teilbäume zum Löschen markieren",
+    )
+    parser.add_argument(
+        "--find-duplicates",
+        action="store_true",
+        help="Analyse: identische Dateien über alle gewählten Gruppenpfade finden (nichts wird gelöscht)",
+    )
+    parser.add_argument(
+        "--hardlink-duplicates",
+        action="store_true",
+        help="Gefundene Duplikate durch Hardlinks auf eine Kopie ersetzen (gleiches Dateisystem, impliziert --find-duplicates)",
+    )
+    parser.add_argument(
+        "--background-delete",
+        action="store_true",
+        help="Verzeichnisse in einen Papierkorb auf demselben Dateisystem verschieben, leer neu anlegen und im Hintergrund löschen",
+    )
+    parser.add_argument(
+        "--background-nice",
+        type=int,
+        choices=range(0, 20),
+        default=DEFAULT_BACKGROUND_NICE,
+        metavar="N",
+        help=f"nice-Wert der Hintergrund-Löschung, 0-19 (Standard: {DEFAULT_BACKGROUND_NICE})",
+    )
+    parser.add_argument(
+        "--background-ionice",
+        choices=tuple(IONICE_CLASSES),
+        default="idle",
+        help="I/O-Klasse der Hintergrund-Löschung über ionice (Standard: idle)",
+    )
+    parser.add_argument("--purge-trash", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Persistenten Größen-Index nicht verwenden (alles neu scannen)",
+    )
+    parser.add_argument(
+        "--all-users",
+        action="store_true",
+        help="Gruppen für alle Benutzer aus /etc/passwd (UID-Bereich) auflösen; Systempfade nur einmal (braucht root)",
+    )
+    parser.add_argument(
+        "--uid-range",
+        type=parse_uid_range,
+        default=DEFAULT_UID_RANGE,
+        help=f"UID-Bereich für --all-users (Standard: {DEFAULT_UID_RANGE[0]}-{DEFAULT_UID_RANGE[1]})",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Unterbrochenen Lauf aus dem Lösch-Journal fortsetzen (ohne Scan und Rückfragen)",
+    )
+    parser.add_argument(
+        "--journal",
+        default=None,
+        help="Pfad des Lösch-Journals (Standard: $XDG_CACHE_HOME/arch-cache-cleaner/journal.jsonl)",
+    )
+    parser.add_argument(
+        "--keep",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="Pfad/Muster beim Löschen aller Gruppen behalten (mehrfach nutzbar, ergänzt 'keep' aus der Config)",
+    )
+    parser.add_argument(
+        "--no-config-cache",
+        action="store_true",
+        help="Vorverarbeitete Config nicht aus dem Cache laden oder dort ablegen",
+    )
+    parser.add_argument(
+        "--scan-only",
+        action="store_true",
+        help="Nur Größen ermitteln (ohne Rückfrage, ohne Löschen, ohne Temp) – z. B. für --metrics-file",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=None,
+        help="Prometheus-Metriken (node_exporter textfile) atomar in diese Datei schreiben",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Dauerbetrieb: Größen per inotify mitführen und Gruppen beim Überschreiten ihres Limits bereinigen",
+    )
+    parser.add_argument(
+        "--watch-max",
+        type=parse_size,
+        default=None,
+        help="Standard-Größenlimit für --watch bei Gruppen ohne watch.max_bytes (z. B. 2G)",
+    )
+    parser.add_argument(
+        "--watch-cooldown",
+        type=float,
+        default=DEFAULT_WATCH_COOLDOWN,
+        help=f"Mindestabstand in Sekunden zwischen zwei Bereinigungen derselben Gruppe (Standard: {DEFAULT_WATCH_COOLDOWN:g})",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Laufzeiten und I/O-Zähler pro Phase, Gruppe und Pfad messen (Report-Abschnitt timings)",
+    )
+    parser.add_argument(
+        "--profile-trace",
+        default=None,
+        help="Chrome-Trace-Events (chrome://tracing, Perfetto) in diese Datei schreiben (aktiviert --profile)",
+    )
+    parser.add_argument(
+        "--output",
+        choices=("text", "ndjson"),
+        default="text",
+        help="ndjson: Ereignisse (group_found, path_sized, path_removed, …) zeilenweise als JSON auf stdout, Text auf stderr",
+    )
+    parser.add_argument(
+        "--color",
+        choices=("auto", "always", "never"),
+        default="auto",
+        help="Farbige Ausgabe: auto, always oder never",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Zusätzliche Diagnoseausgaben aktivieren",
+    )
+    return parser.parse_args()
+
+
+def parse_only_groups(raw_only: str | None) -> set[str] | None:
+    if raw_only is None:
+        return None
+
+    keys = {chunk.strip() for chunk in raw_only.split(",") if chunk.strip()}
+    if not keys:
+        return None
+    return keys
+
+
+def filter_groups(groups: dict[str, CacheGroup], only_keys: set[str] | None) -> dict[str, CacheGroup]:
+    if not only_keys:
+        return groups
+    return {key: value for key, value in groups.items() if key in only_keys}
+
+
+def print_group_overview(groups: dict[str, CacheGroup], accounts: list[UserAccount] | None = None) -> None:
+    print("\nVerfügbare Gruppen")
+    print("------------------")
+    group_paths = resolve_group_paths(groups, accounts=accounts)
+    for key, group in groups.items():
+        existing = dedupe_paths([path for path in group_paths[key] if path_exists(path)])
+        print(f"- {key}: {group.title}")
+        if existing:
+            for path in existing:
+                print(f"    * {path}")
+        else:
+            print("    * keine vorhandenen Pfade")
+
+
+def debug_log(enabled: bool, style: CliStyle, message: str) -> None:
+    if enabled:
+        print(style.dim(f"[DEBUG] {message}"))
+
+
+def colors_enabled(mode: str) -> bool:
+    if mode == "always":
+        return True
+    if mode == "never":
+        return False
+    return sys.stdout.isatty() and os.environ.get("NO_COLOR") is None
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def metric_labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{escape_label_value(value)}"' for key, value in labels.items()) + "}"
+
+
+def render_metrics(report: dict[str, Any]) -> str:
+    prefix = "arch_cache_cleaner"
+    metrics: dict[str, tuple[str, list[tuple[str, float]]]] = {
+        "group_bytes": ("Size of the existing paths of a group in bytes.", []),
+        "group_paths": ("Number of existing paths of a group.", []),
+        "group_selected": ("Whether the group was cleaned in this run (1) or not (0).", []),
+        "group_cleaned_paths": ("Paths of a group that were cleaned successfully.", []),
+        "group_failed_paths": ("Paths of a group that could not be cleaned completely.", []),
+        "group_failed_entries": ("Individual entries of a group that could not be removed.", []),
+        "group_removed_files": ("Files removed by eviction or pacman pruning in a group.", []),
+        "group_engine_reclaimed_bytes": ("Bytes reclaimed through container engine prune endpoints in a group.", []),
+        "path_bytes": ("Size of a configured cache path in bytes.", []),
+        "user_bytes": ("Size of the existing cache paths owned by a user (--all-users) in bytes.", []),
+    }
+
+    for group in report["groups"]:
+        labels = metric_labels(group=group["key"])
+        metrics["group_bytes"][1].append((labels, group.get("paths_found_bytes", 0)))
+        metrics["group_paths"][1].append((labels, len(group["paths_found"])))
+        metrics["group_selected"][1].append((labels, int(group["selected"])))
+        metrics["group_cleaned_paths"][1].append((labels, len(group["cleaned"])))
+        metrics["group_failed_paths"][1].append((labels, len(group["failed"])))
+        metrics["group_failed_entries"][1].append((labels, len(group.get("failed_entries", []))))
+        removed_files = group.get("evicted_files", group.get("pacman_removed"))
+        if removed_files is not None:
+            metrics["group_removed_files"][1].append((labels, removed_files))
+        if "engine_reclaimed_bytes" in group:
+            metrics["group_engine_reclaimed_bytes"][1].append((labels, group["engine_reclaimed_bytes"]))
+        for path, size in group.get("paths_found_sizes", {}).items():
+            metrics["path_bytes"][1].append((metric_labels(group=group["key"], path=path), size))
+
+    for user, stats in report.get("users", {}).items():
+        metrics["user_bytes"][1].append((metric_labels(user=user), stats["found_bytes"]))
+
+    totals = report["totals"]
+    temp_cleanup = report["temp_cleanup"]
+    scalars = {
+        "found_bytes": ("Total size of all existing paths in bytes.", totals["found_bytes"]),
+        "found_paths": ("Total number of existing paths.", totals["found_paths"]),
+        "cleaned_paths": ("Paths and temp roots cleaned in this run.", totals["cleaned"]),
+        "failed_paths": ("Paths and temp entries that failed in this run.", totals["failed"]),
+        "groups_selected": ("Groups cleaned in this run.", totals["groups_selected"]),
+        "temp_failed_entries": ("Temp entries that could not be removed.", len(temp_cleanup["failed"])),
+        "dry_run": ("Whether the run was a dry run (1) or not (0).", int(report["dry_run"])),
+        "run_duration_seconds": ("Wall time of the run in seconds.", report.get("duration_seconds", 0)),
+        "last_run_timestamp_seconds": (
+            "Unix time at which the run started.",
+            datetime.fromisoformat(report["timestamp"]).timestamp(),
+        ),
+    }
+
+    lines: list[str] = []
+    for name, (help_text, samples) in metrics.items():
+        if not samples:
+            continue
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        lines.extend(f"{prefix}_{name}{labels} {value}" for labels, value in samples)
+    for name, (help_text, value) in scalars.items():
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        lines.append(f"{prefix}_{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path: Path, report: dict[str, Any], style: CliStyle) -> bool:
+    import tempfile
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(render_metrics(report))
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+            raise
+        print(style.success(f"[OK] Metriken geschrieben: {path}"))
+        return True
+    except OSError as exc:
+        print(style.error(f"[ERROR] Metriken konnten nicht geschrieben werden ({path}): {exc}"))
+        return False
+
+
+def write_report(path: Path, report: dict[str, Any], style: CliStyle) -> bool:
+    import json
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(style.success(f"[OK] Report geschrieben: {path}"))
+        return True
+    except OSError as exc:
+        print(style.error(f"[ERROR] Report konnte nicht geschrieben werden ({path}): {exc}"))
+        return False
+
+
+def path_timings(paths: list[Path]) -> list[dict[str, Any]]:
+    timings: list[dict[str, Any]] = []
+    for path in paths:
+        events = PROFILER.event_args("path", path=str(path))
+        counters: dict[str, int] = {}
+        for event in events:
+            merge_counters(counters, event.get("counters", {}))
+        timings.append({
+            "path": str(path),
+            "seconds": PROFILER.seconds("path", path=str(path)),
+            "bytes_freed": sum(event.get("bytes_freed", 0) for event in events),
+            "counters": counters,
+        })
+    return timings
+
+
+def print_timings(timings: dict[str, Any], style: CliStyle) -> None:
+    print("\n" + style.subtitle("⏱ Laufzeit"))
+    print(style.subtitle("-------------"))
+    print(f"{style.accent('•')} Gesamt: {timings['total_seconds']:.3f}s")
+    for phase, seconds in timings["phases"].items():
+        print(f"{style.accent('•')} {phase}: {seconds:.3f}s")
+    counters = ", ".join(f"{name}={value}" for name, value in sorted(timings["counters"].items()))
+    if counters:
+        print(style.dim(f"  {counters}"))
+
+
+def format_rate(rate: float) -> str:
+    return f"{'+' if rate >= 0 else '-'}{format_bytes(int(abs(rate)))}/Tag"
+
+
+def format_days_to_full(days: float | None) -> str:
+    return f"voll in ~{days:.0f} Tagen" if days is not None else "kein Wachstum"
+
+
+def print_trends(trends: dict[str, Any], titles: dict[str, str], style: CliStyle) -> None:
+    print("\n" + style.subtitle(f"📈 Trends (letzte {trends['window_days']} Tage, {trends['runs']} Läufe)"))
+    print(style.subtitle("-------------"))
+    if not trends["groups"]:
+        print(style.dim("[INFO] Noch keine Verlaufsdaten im Zeitraum."))
+        return
+    print("Gruppen:")
+    for group_key, group in trends["groups"].items():
+        print(
+            f"  {style.accent('•')} {titles.get(group_key, group_key)}: {format_bytes(group['bytes'])}, "
+            f"{format_rate(group['growth_bytes_per_day'])}, {format_days_to_full(group['days_to_full'])}"
+        )
+    if trends["filesystems"]:
+        print("Dateisysteme:")
+        for filesystem in trends["filesystems"].values():
+            print(
+                f"  {style.accent('•')} {filesystem['mount']}: {format_bytes(filesystem['free_bytes'])} frei von "
+                f"{format_bytes(filesystem['total_bytes'])}, Caches {format_rate(filesystem['growth_bytes_per_day'])}, "
+                f"{format_days_to_full(filesystem['days_to_full'])}"
+            )
+
+
+def print_summary(report: dict[str, Any], cleaned: list[str], failed: list[str], style: CliStyle) -> None:
+    totals = report["totals"]
+    print("\n" + style.subtitle("📊 Zusammenfassung"))
+    print(style.subtitle("-------------"))
+    print(f"{style.accent('•')} Gefundene Pfade: {totals['found_paths']}")
+    print(f"{style.accent('•')} Gefundene Größe: {format_bytes(totals['found_bytes'])}")
+    print(f"{style.accent('•')} Gewählte Gruppen: {totals['groups_selected']}/{totals['groups_total']}")
+    print(f"{style.accent('•')} Erfolgreich bearbeitet: {len(cleaned)}")
+    if failed:
+        print(style.warn(f"{style.accent('•')} Fehlgeschlagen/übersprungen wegen Rechten: {len(failed)}"))
+    else:
+        print(style.success(f"{style.accent('•')} Fehlgeschlagen/übersprungen wegen Rechten: {len(failed)}"))
+
+    if "users" in report:
+        print("\nPro Benutzer:")
+        for user, stats in report["users"].items():
+            print(
+                f"  {style.accent('•')} {user}: {format_bytes(stats['found_bytes'])} in {stats['paths_found']} Pfaden, "
+                f"bereinigt {stats['cleaned']}, fehlgeschlagen {stats['failed']}"
+            )
+
+    if cleaned:
+        print("\nBereinigt:")
+        for item in cleaned:
+            print(f"  {style.success('✓')} {item}")
+
+    if failed:
+        print("\nNicht bereinigt:")
+        for item in failed:
+            print(f"  {style.warn('⚠')} {item}")
+
+
+def finalize_run(
+    report: dict[str, Any],
+    args: argparse.Namespace,
+    style: CliStyle,
+    run_started: float,
+    size_index: SizeIndex | None,
+    group_timings: list[dict[str, Any]],
+) -> int:
+    if PROFILER.enabled:
+        counters = PROFILER.snapshot()
+        if size_index is not None:
+            counters["index_hits"] = size_index.hits
+            counters["index_misses"] = size_index.misses
+        report["timings"] = {
+            "total_seconds": round(time.perf_counter() - run_started, 6),
+            "phases": PROFILER.phase_seconds(),
+            "counters": counters,
+            "groups": group_timings,
+        }
+        print_timings(report["timings"], style)
+        if args.profile_trace:
+            trace_path = Path(os.path.expanduser(os.path.expandvars(args.profile_trace))).resolve(strict=False)
+            write_report(trace_path, PROFILER.trace(), style)
+
+    report["duration_seconds"] = round(time.perf_counter() - run_started, 6)
+    EVENTS.emit(
+        "summary",
+        dry_run=report["dry_run"],
+        duration_seconds=report["duration_seconds"],
+        totals=report["totals"],
+        groups=[
+            {
+                "group": group["key"],
+                "action": group["action"],
+                "bytes": group.get("paths_found_bytes", 0),
+                "cleaned": len(group["cleaned"]),
+                "failed": len(group["failed"]),
+            }
+            for group in report["groups"]
+        ],
+        temp_cleanup={
+            "executed": report["temp_cleanup"]["executed"],
+            "cleaned": len(report["temp_cleanup"]["cleaned"]),
+            "failed": len(report["temp_cleanup"]["failed"]),
+        },
+    )
+    if args.metrics_file:
+        metrics_path = Path(os.path.expanduser(os.path.expandvars(args.metrics_file))).resolve(strict=False)
+        write_metrics(metrics_path, report, style)
+
+    if args.export_report:
+        report_path = Path(os.path.expanduser(os.path.expandvars(args.export_report))).resolve(strict=False)
+        write_report(report_path, report, style)
+
+    print("\n" + style.success("Fertig."))
+    return 0
+
+
+def run_duplicates(
+    report: dict[str, Any],
+    group_paths: dict[str, list[Path]],
+    group_keep: dict[str, KeepRules | None],
+    jobs: int,
+    args: argparse.Namespace,
+    style: CliStyle,
+    run_started: float,
+) -> int:
+    roots = [(path, group_keep.get(group_key)) for group_key, paths in group_paths.items() for path in paths]
+    print(style.info(f"[INFO] Suche Duplikate in {len(roots)} Pfaden …"))
+    with PROFILER.span("duplicates"):
+        sets = find_duplicates(roots, jobs)
+    print_duplicates(sets, style, None if args.debug else DUPLICATE_LIST_LIMIT)
+
+    report["duplicates"] = {
+        "sets": [
+            {"size": duplicate.size, "digest": duplicate.digest, "paths": [entry.path for entry in duplicate.files]}
+            for duplicate in sets
+        ],
+        "duplicate_files": sum(len(duplicate.files) - 1 for duplicate in sets),
+        "reclaimable_bytes": sum(duplicate.reclaimable for duplicate in sets),
+    }
+    report["totals"]["found_paths"] = len(roots)
+    report["totals"]["groups_selected"] = len(group_paths)
+
+    if args.hardlink_duplicates and sets:
+        if not args.yes and not args.dry_run and not ask_yes_no("Duplikate durch Hardlinks ersetzen?"):
+            print(style.info("[INFO] Hardlinks übersprungen."))
+        else:
+            with PROFILER.span("hardlink"):
+                linked, saved, failed = hardlink_duplicates(sets, dry_run=args.dry_run)
+            report["duplicates"]["hardlinked"] = {"files": linked, "saved_bytes": saved, "failed": failed}
+            report["totals"]["cleaned"] = linked
+            report["totals"]["failed"] = len(failed)
+            message = f"[OK] {linked} Dateien verlinkt, {format_bytes(saved)} eingespart."
+            print(style.warn(message) if failed else style.success(message))
+    return finalize_run(report, args, style, run_started, None, [])
+
+
+def run_explore(
+    report: dict[str, Any],
+    groups: dict[str, CacheGroup],
+    group_paths: dict[str, list[Path]],
+    group_keep: dict[str, KeepRules | None],
+    jobs: int,
+    args: argparse.Namespace,
+    style: CliStyle,
+    run_started: float,
+    accounts: list[UserAccount] | None = None,
+) -> int:
+    try:
+        import curses
+    except ImportError:
+        print(style.error("[ERROR] --explore braucht das curses-Modul (unter Windows nicht verfügbar)."))
+        return 1
+    if not (sys.stdin.isatty() and sys.stdout.isatty()):
+        print(style.error("[ERROR] --explore braucht ein interaktives Terminal."))
+        return 1
+
+    print(style.info("[INFO] Scanne Gruppenpfade für den Explorer …"))
+    with PROFILER.span("scan"):
+        tree = UsageTree.scan(groups, group_paths)
+    debug_log(args.debug, style, f"Explorer tree: {len(tree.names)} nodes")
+    selected = curses.wrapper(explore_ui, tree)
+    if not selected:
+        print(style.info("[INFO] Nichts markiert, nichts gelöscht."))
+        return finalize_run(report, args, style, run_started, None, [])
+
+    print("\n" + style.subtitle("🗑 Markiert"))
+    print(style.dim("-" * 40))
+    for node in selected:
+        print(f"  {style.accent('•')} {tree.path_of(node)} ({format_bytes(tree.sizes[node])})")
+    if not args.yes and not args.dry_run and not ask_yes_no("Markierte Einträge löschen?"):
+        print(style.info("[INFO] Abgebrochen, nichts gelöscht."))
+        return finalize_run(report, args, style, run_started, None, [])
+
+    marked_by_group: dict[str, list[int]] = {}
+    for node in selected:
+        marked_by_group.setdefault(tree.group_of(node), []).append(node)
+
+    cleaned: list[str] = []
+    failed: list[str] = []
+    engine = DeletionEngine(jobs=jobs)
+    try:
+        for group_key, nodes in marked_by_group.items():
+            group = groups[group_key]
+            roots = [tree.roots[node][1] for node in nodes if node in tree.roots]
+            subtrees = [tree.path_of(node) for node in nodes if node not in tree.roots]
+            group_report: dict[str, Any] = {
+                "key": group_key,
+                "title": group.title,
+                "paths_found": [str(path) for path in [*roots, *subtrees]],
+                "paths_found_count": len(nodes),
+                "paths_found_bytes": sum(tree.sizes[node] for node in nodes),
+                "paths_found_sizes": {str(tree.path_of(node)): tree.sizes[node] for node in nodes},
+                "selected": True,
+                "action": "explore",
+                "cleaned": [],
+                "failed": [],
+                "failed_entries": [],
+            }
+            with PROFILER.span("delete", group=group_key):
+                results = clean_as_owners(
+                    roots,
+                    accounts,
+                    lambda paths, _account: clean_group(group, paths, dry_run=args.dry_run, engine=engine,
+                                                        group_report=group_report, keep=group_keep.get(group_key)),
+                ) if roots else []
+                results += clean_as_owners(
+                    subtrees,
+                    accounts,
+                    lambda paths, _account: clear_paths(paths, dry_run=args.dry_run, engine=engine,
+                                                        keep=group_keep.get(group_key)),
+                )
+            for path in subtrees:
+                if not args.dry_run and path.is_dir() and not path.is_symlink():
+                    with contextlib.suppress(OSError):
+                        path.rmdir()
+            for path, path_ok, path_failed_entries in results:
+                (cleaned if path_ok else failed).append(str(path))
+                group_report["cleaned" if path_ok else "failed"].append(str(path))
+                group_report["failed_entries"].extend(path_failed_entries)
+            report["groups"].append(group_report)
+    finally:
+        engine.close()
+
+    report["totals"]["cleaned"] = len(cleaned)
+    report["totals"]["failed"] = len(failed)
+    report["totals"]["found_paths"] = len(selected)
+    report["totals"]["found_bytes"] = sum(tree.sizes[node] for node in selected)
+    report["totals"]["groups_selected"] = len(marked_by_group)
+    print_summary(report, cleaned, failed, style)
+    return finalize_run(report, args, style, run_started, None, [])
+
+
+def create_stager(args: argparse.Namespace, run_id: str, style: CliStyle) -> TrashStager | None:
+    if not args.background_delete or args.dry_run or args.scan_only:
+        return None
+    if os.name != "posix":
+        print(style.warn("[WARN] --background-delete wird nur unter Linux/macOS unterstützt, lösche direkt."))
+        return None
+    if args.free_at_least is not None or args.target_free is not None:
+        print(style.warn("[WARN] --background-delete im Budget-Modus ignoriert (Platz muss sofort frei werden)."))
+        return None
+    return TrashStager(default_trash_registry(), run_id)
+
+
+def start_background_delete(
+    report: dict[str, Any], args: argparse.Namespace, stager: TrashStager | None, style: CliStyle
+) -> None:
+    if args.dry_run or args.scan_only or os.name != "posix":
+        return
+    pending = pending_trash(default_trash_registry())
+    if not pending:
+        return
+    pid = spawn_trash_worker(args.background_nice, args.background_ionice)
+    report["background_delete"] = {
+        "staged": stager.staged if stager is not None else [],
+        "staging_dirs": [str(staging) for staging in pending],
+        "pid": pid,
+    }
+    if pid is not None and not args.quiet:
+        print(style.info(
+            f"[INFO] Hintergrund-Löschung gestartet (PID {pid}, nice {args.background_nice}): "
+            f"{len(pending)} Papierkorb-Verzeichnis(se)"
+        ))
+
+
+def resume_run(
+    report: dict[str, Any],
+    groups: dict[str, CacheGroup],
+    group_keep: dict[str, KeepRules | None],
+    journal_path: Path,
+    jobs: int,
+    args: argparse.Namespace,
+    style: CliStyle,
+    run_started: float,
+    accounts: list[UserAccount] | None = None,
+) -> int:
+    state = read_journal(journal_path)
+    if state is None or state["finished"]:
+        print(style.info(f"[INFO] Kein unterbrochener Lauf im Journal ({journal_path})."))
+        return 0
+
+    print(style.info(f"[INFO] Setze Lauf vom {state['meta'].get('timestamp', '?')} fort ({journal_path})."))
+    try:
+        os.truncate(journal_path, state["valid_bytes"])
+    except OSError as exc:
+        print(style.warn(f"[WARN] Journal konnte nicht gekürzt werden ({journal_path}): {exc}"))
+    journal = DeletionJournal(journal_path, {}, resume=True)
+    with contextlib.suppress(OSError):
+        journal.open_handle()
+    stager = create_stager(args, f"{int(time.time())}-{os.getpid()}", style)
+    engine = DeletionEngine(jobs=jobs)
+    try:
+        for group_key, planned in state["groups"].items():
+            remaining = [Path(path) for path in planned["paths"] if (group_key, path) not in state["done"]]
+            if not remaining:
+                continue
+            group = groups.get(group_key)
+            if group is None:
+                print(style.warn(f"[WARN] Gruppe {group_key} fehlt in der Config, offene Pfade übersprungen."))
+                continue
+            print(style.info(f"[INFO] {planned['title']}: {len(remaining)} offene Pfade"))
+            record = path_done_callback(group_key, False, journal)
+
+            def on_done(
+                path: Path, ok: bool, failed_entries: list[str], group_key: str = group_key, record: Any = record
+            ) -> None:
+                state["done"][(group_key, str(path))] = {"ok": ok, "failed_entries": failed_entries}
+                if record is not None:
+                    record(path, ok, failed_entries)
+
+            with PROFILER.span("delete", group=group_key):
+                clean_as_owners(
+                    remaining,
+                    accounts,
+                    lambda paths, account: clean_group(
+                        group, paths, dry_run=False, engine=engine, group_report={}, keep=group_keep.get(group_key),
+                        on_done=on_done, stager=stager if account is None else None),
+                )
+    finally:
+        engine.close()
+    journal.finish()
+
+    cleaned: list[str] = []
+    failed: list[str] = []
+    for group_key, planned in state["groups"].items():
+        group_report: dict[str, Any] = {
+            "key": group_key,
+            "title": planned["title"],
+            "paths_found": planned["paths"],
+            "paths_found_count": len(planned["paths"]),
+            "paths_found_bytes": sum(planned["sizes"].values()),
+            "paths_found_sizes": planned["sizes"],
+            "selected": True,
+            "action": "resumed",
+            "cleaned": [],
+            "failed": [],
+            "failed_entries": [],
+        }
+        for path in planned["paths"]:
+            done = state["done"].get((group_key, path))
+            if done is not None and done["ok"]:
+                cleaned.append(path)
+                group_report["cleaned"].append(path)
+            else:
+                failed.append(path)
+                group_report["failed"].append(path)
+                if done is not None:
+                    group_report["failed_entries"].extend(done["failed_entries"])
+        report["groups"].append(group_report)
+
+    report["resumed"] = {"journal": str(journal_path), "started": state["meta"].get("timestamp")}
+    report["totals"]["cleaned"] = len(cleaned)
+    report["totals"]["failed"] = len(failed)
+    report["totals"]["found_paths"] = sum(len(planned["paths"]) for planned in state["groups"].values())
+    report["totals"]["found_bytes"] = sum(sum(planned["sizes"].values()) for planned in state["groups"].values())
+    report["totals"]["groups_selected"] = len(state["groups"])
+    start_background_delete(report, args, stager, style)
+    print_summary(report, cleaned, failed, style)
+    return finalize_run(report, args, style, run_started, None, [])
+
+
+def main() -> int:
+    args = parse_args()
+    if args.output == "ndjson":
+        EVENTS.handle = sys.stdout
+        sys.stdout = sys.stderr
+    if args.purge_trash:
+        with contextlib.suppress(AttributeError, OSError):
+            os.nice(args.background_nice)
+        engine = DeletionEngine(jobs=1)
+        try:
+            return 1 if purge_trash(default_trash_registry(), engine) else 0
+        finally:
+            engine.close()
+    PROFILER.enabled = args.profile or bool(args.profile_trace)
+    run_started = time.perf_counter()
+    style = CliStyle(enabled=colors_enabled(args.color))
+    platform_key = detect_platform()
+    raw_config_path = args.config if args.config else str(
+        resolve_default_config_path())
+    config_path = Path(os.path.expanduser(
+        os.path.expandvars(raw_config_path))).resolve(strict=False)
+    debug_log(args.debug, style, f"Resolved config path: {config_path}")
+    config_cache_path = None if args.no_config_cache else default_config_cache_path(config_path)
+    try:
+        with PROFILER.span("config"):
+            groups, config_keep, config_cached = load_platform_groups(config_path, platform_key, config_cache_path)
+    except (OSError, ValueError) as exc:
+        print(style.error(f"[ERROR] Konnte Config nicht laden: {exc}"))
+        return 1
+    debug_log(args.debug, style, f"Config cache: {'hit' if config_cached else 'miss'} ({config_cache_path})")
+
+    if not groups:
+        print(style.error("[ERROR] Keine gültigen Cache-Gruppen verfügbar."))
+        return 1
+
+    only_keys = parse_only_groups(args.only)
+    unknown_only_keys: set[str] = set()
+    if only_keys:
+        unknown_only_keys = only_keys.difference(groups.keys())
+        groups = filter_groups(groups, only_keys)
+
+    if not groups:
+        print(style.error("[ERROR] Keine passenden Gruppen ausgewählt."))
+        return 1
+
+    print("\n" + style.title("Cache Cleaner (Python, Cross-Platform)"))
+    print(style.title("======================================"))
+    print(f"Detected OS: {system_name()} ({platform_key})")
+    print(f"Config: {config_path}")
+    if only_keys:
+        print(f"Gruppenfilter: {', '.join(sorted(only_keys))}")
+        if unknown_only_keys:
+            print(style.warn(f"[WARN] Unbekannte Gruppen ignoriert: {', '.join(sorted(unknown_only_keys))}"))
+    if args.dry_run:
+        print(style.warn("Modus: DRY-RUN (es wird nichts gelöscht)"))
+    accounts: list[UserAccount] | None = None
+    if args.all_users:
+        if platform_key != "linux":
+            print(style.error("[ERROR] --all-users wird nur unter Linux unterstützt."))
+            return 1
+        try:
+            accounts = list_user_accounts(args.uid_range)
+        except OSError as exc:
+            print(style.error(f"[ERROR] Benutzerliste konnte nicht gelesen werden: {exc}"))
+            return 1
+        if not accounts:
+            print(style.error(f"[ERROR] Keine Benutzer im UID-Bereich {args.uid_range[0]}-{args.uid_range[1]}."))
+            return 1
+        print(f"Benutzer: {', '.join(account.name for account in accounts)}")
+        if hasattr(os, "geteuid") and os.geteuid() != 0:
+            print(style.warn("[WARN] --all-users ohne root: fremde Home-Verzeichnisse sind vermutlich nicht lesbar."))
+    jobs = args.jobs
+    if jobs < 1:
+        print(style.warn("[WARN] --jobs muss >= 1 sein, verwende 1."))
+        jobs = 1
+    debug_log(args.debug, style, f"Active group keys: {', '.join(groups.keys())}")
+
+    report: dict[str, Any] = {
+        "timestamp": datetime.now().astimezone().isoformat(),
+        "platform": {
+            "detected": system_name(),
+            "key": platform_key,
+        },
+        "config": str(config_path),
+        "dry_run": args.dry_run,
+        "options": {
+            "yes": args.yes,
+            "only": sorted(only_keys) if only_keys else [],
+            "no_temp": args.no_temp,
+            "temp_days": args.temp_days,
+            "temp_age_field": args.temp_age_field,
+            "list_groups": args.list_groups,
+            "no_index": args.no_index,
+            "no_config_cache": args.no_config_cache,
+            "keep": args.keep,
+            "all_users": args.all_users,
+            "resume": args.resume,
+            "background_delete": args.background_delete,
+            "explore": args.explore,
+            "trends": args.trends,
+            "no_history": args.no_history,
+            "find_duplicates": args.find_duplicates,
+            "hardlink_duplicates": args.hardlink_duplicates,
+            "uid_range": list(args.uid_range),
+            "jobs": jobs,
+            "free_at_least": args.free_at_least,
+            "target_free": args.target_free,
+            "priority": args.priority,
+            "scan_only": args.scan_only,
+            "metrics_file": args.metrics_file,
+            "watch": args.watch,
+            "profile": args.profile,
+            "profile_trace": args.profile_trace,
+            "color": args.color,
+            "output": args.output,
+            "debug": args.debug,
+        },
+        "groups": [],
+        "temp_cleanup": {
+            "executed": False,
+            "days": None,
+            "cleaned": [],
+            "failed": [],
+        },
+        "totals": {
+            "cleaned": 0,
+            "failed": 0,
+            "found_paths": 0,
+            "found_bytes": 0,
+            "groups_total": len(groups),
+            "groups_selected": 0,
+        },
+    }
+
+    history_path = (
+        Path(os.path.expanduser(os.path.expandvars(args.history_db))).resolve(strict=False)
+        if args.history_db
+        else default_history_path()
+    )
+    if args.trends is not None:
+        import sqlite3
+
+        try:
+            with PROFILER.span("trends"):
+                report["trends"] = history_trends(history_path, int(time.time()), args.trends, set(groups))
+        except sqlite3.Error as exc:
+            print(style.error(f"[ERROR] Verlauf konnte nicht gelesen werden ({history_path}): {exc}"))
+            return 1
+        print_trends(report["trends"], {key: group.title for key, group in groups.items()}, style)
+        return finalize_run(report, args, style, run_started, None, [])
+
+    if args.list_groups:
+        print_group_overview(groups, accounts)
+        if args.export_report:
+            listed_paths = resolve_group_paths(groups, accounts=accounts)
+            report["groups"] = [
+                {
+                    "key": key,
+                    "title": group.title,
+                    "paths_found": [str(path) for path in listed_paths[key] if path_exists(path)],
+                    "selected": False,
+                    "action": "list_only",
+                    "cleaned": [],
+                    "failed": [],
+                }
+                for key, group in groups.items()
+            ]
+            report_path = Path(os.path.expanduser(os.path.expandvars(args.export_report))).resolve(strict=False)
+            write_report(report_path, report, style)
+        return 0
+
+    cleaned: list[str] = []
+    failed: list[str] = []
+    found_paths_total = 0
+    found_bytes_total = 0
+    selected_groups = 0
+
+    path_owners: dict[Path, str] = {}
+    with PROFILER.span("resolve"):
+        resolved_paths = resolve_group_paths(groups, accounts=accounts, owners=path_owners)
+    group_paths = {
+        group_key: dedupe_paths([path for path in paths if path_exists(path)])
+        for group_key, paths in resolved_paths.items()
+    }
+    counted_paths = collapse_nested_paths(group_paths)
+    for group_key, paths in group_paths.items():
+        dropped = len(paths) - len(counted_paths[group_key])
+        if dropped:
+            debug_log(args.debug, style, f"Group {group_key}: {dropped} nested/aliased paths not counted twice")
+    group_keep = {
+        group_key: build_keep_rules([
+            *config_keep,
+            *args.keep,
+            *group.exclude,
+            *(raw[1:] for raw in group.paths if raw.startswith("!")),
+        ], accounts)
+        for group_key, group in groups.items()
+    }
+
+    if args.find_duplicates or args.hardlink_duplicates:
+        return run_duplicates(report, counted_paths, group_keep, jobs, args, style, run_started)
+    if args.explore:
+        return run_explore(report, groups, counted_paths, group_keep, jobs, args, style, run_started, accounts)
+
+    journal_path = (
+        Path(os.path.expanduser(os.path.expandvars(args.journal))).resolve(strict=False)
+        if args.journal
+        else default_journal_path()
+    )
+    if args.resume:
+        return resume_run(report, groups, group_keep, journal_path, jobs, args, style, run_started, accounts)
+    if not args.dry_run and not args.scan_only and journal_path.exists():
+        previous = read_journal(journal_path)
+        if previous is not None and not previous["finished"]:
+            print(style.warn(
+                f"[WARN] Unterbrochener Lauf vom {previous['meta'].get('timestamp', '?')} im Journal {journal_path} "
+                "(mit --resume fortsetzen, ein neuer Lauf überschreibt es)."
+            ))
+
+    if args.watch:
+        engine = DeletionEngine(jobs=jobs)
+        try:
+            return watch_groups(
+                groups,
+                counted_paths,
+                default_max_bytes=args.watch_max,
+                cooldown=args.watch_cooldown,
+                dry_run=args.dry_run,
+                engine=engine,
+                style=style,
+                group_keep=group_keep,
+                accounts=accounts,
+            )
+        finally:
+            engine.close()
+
+    path_groups = {path: group_key for group_key, paths in group_paths.items() for path in paths}
+    for group_key, paths in group_paths.items():
+        if paths:
+            EVENTS.emit("group_found", group=group_key, title=groups[group_key].title, paths=[str(path) for path in paths])
+
+    def emit_sized(path: Path, size: int) -> None:
+        EVENTS.emit("path_sized", group=path_groups[path], path=str(path), bytes=size)
+
+    def record_background_sizes(group_key: str, group_report: dict[str, Any]) -> int:
+        existing = group_paths[group_key]
+        group_report["paths_found_bytes"] = sum(size_futures[path].result() for path in existing)
+        group_report["paths_found_sizes"] = {str(path): size_futures[path].result() for path in existing}
+        for path in existing:
+            emit_sized(path, size_futures[path].result())
+        return sum(size_futures[path].result() for path in counted_paths[group_key])
+
+    size_index = None if args.no_index else SizeIndex.load(default_index_path())
+    all_paths = [path for paths in group_paths.values() for path in paths]
+    path_sizes: dict[Path, int] = {}
+    size_futures: dict[Path, Future[int]] = {}
+    budget_mode = args.free_at_least is not None or args.target_free is not None
+    if args.yes or budget_mode or args.scan_only:
+        with PROFILER.span("scan"):
+            path_sizes = scan_sizes(all_paths, index=size_index, on_sized=emit_sized if EVENTS.enabled else None)
+        debug_log(args.debug, style, f"Scanned {len(path_sizes)} paths")
+        save_size_index(size_index, args.debug, style)
+    else:
+        size_futures = start_background_sizing(all_paths, size_index)
+
+    engine = DeletionEngine(jobs=jobs)
+    run_id = f"{int(time.time())}-{os.getpid()}"
+    stager = create_stager(args, run_id, style)
+    journal = None
+    if not args.dry_run and not args.scan_only:
+        journal = DeletionJournal(journal_path, {
+            "run_id": run_id,
+            "timestamp": report["timestamp"],
+            "config": report["config"],
+        })
+    group_reports: dict[str, dict[str, Any]] = {}
+    group_timings: list[dict[str, Any]] = []
+    selected_paths: dict[str, list[Path]] = {}
+    unsized_reports: dict[str, dict[str, Any]] = {}
+    for group_key, group in groups.items():
+        existing = group_paths[group_key]
+        debug_log(args.debug, style, f"Group {group_key}: {len(existing)} existing paths")
+        preview: LiveGroupPreview | None = None
+        if args.yes or budget_mode or args.scan_only or not existing:
+            found_count, found_bytes = print_group_preview(
+                group, existing, quiet=args.quiet, style=style, sizes=path_sizes)
+            found_bytes_total += sum(path_sizes[path] for path in counted_paths[group_key])
+        else:
+            preview = LiveGroupPreview(group, existing, style, size_futures, live=sys.stdout.isatty())
+            preview.show()
+            found_count, found_bytes = len(existing), 0
+        found_paths_total += len(counted_paths[group_key])
+
+        group_report = {
+            "key": group_key,
+            "title": group.title,
+            "paths_found": [str(path) for path in existing],
+            "paths_found_count": found_count,
+            "paths_found_bytes": found_bytes,
+            "paths_found_sizes": {str(path): path_sizes.get(path, 0) for path in existing},
+            "selected": False,
+            "action": "skipped_no_paths" if not existing else "pending",
+            "cleaned": [],
+            "failed": [],
+            "failed_entries": [],
+        }
+
+        if not existing:
+            report["groups"].append(group_report)
+            continue
+
+        if args.scan_only:
+            group_report["action"] = "scan_only"
+            report["groups"].append(group_report)
+            continue
+
+        if budget_mode:
+            group_report["action"] = "skipped_budget"
+            group_reports[group_key] = group_report
+            report["groups"].append(group_report)
+            continue
+
+        with PROFILER.span("prompt", group=group_key):
+            should_clean = args.yes or ask_yes_no(group.prompt, on_invalid=preview.detach if preview else None)
+        if preview is not None and should_clean:
+            preview.finish()
+            found_bytes_total += record_background_sizes(group_key, group_report)
+        elif preview is not None:
+            preview.detach()
+            unsized_reports[group_key] = group_report
+        if not should_clean:
+            if not args.quiet:
+                print(style.info(f"[INFO] Übersprungen: {group.title}"))
+            group_report["action"] = "skipped_by_user"
+            report["groups"].append(group_report)
+            continue
+
+        group_report["selected"] = True
+        group_report["action"] = "processed"
+        selected_groups += 1
+
+        selected_paths[group_key] = existing
+        existing = collapse_nested_paths(selected_paths)[group_key]
+        covered = len(selected_paths[group_key]) - len(existing)
+        if covered:
+            debug_log(args.debug, style, f"Group {group_key}: {covered} paths covered by selected groups")
+        selected_paths[group_key] = existing
+        if journal is not None:
+            journal.plan(group_key, group.title, existing, group_report["paths_found_sizes"])
+        on_done = path_done_callback(group_key, args.dry_run, journal)
+        counters_before = PROFILER.snapshot()
+        with PROFILER.span("delete", group=group_key):
+            results = clean_as_owners(
+                existing,
+                accounts,
+                lambda paths, account: clean_group(
+                    group, paths, dry_run=args.dry_run, engine=engine, group_report=group_report,
+                    keep=group_keep[group_key], on_done=on_done, stager=stager if account is None else None),
+            )
+        if PROFILER.enabled:
+            counters_after = PROFILER.snapshot()
+            paths_timings = path_timings(existing)
+            group_timings.append({
+                "key": group_key,
+                "prompt_seconds": PROFILER.seconds("phase", "prompt", group=group_key),
+                "delete_seconds": PROFILER.seconds("phase", "delete", group=group_key),
+                "bytes_freed": sum(timing["bytes_freed"] for timing in paths_timings) + (
+                    0 if args.dry_run else group_report.get("engine_reclaimed_bytes", 0)),
+                "counters": {
+                    name: value - counters_before.get(name, 0)
+                    for name, value in counters_after.items()
+                    if value != counters_before.get(name, 0)
+                },
+                "paths": paths_timings,
+            })
+        for path, path_ok, path_failed_entries in results:
+            if path_ok:
+                cleaned.append(str(path))
+                group_report["cleaned"].append(str(path))
+            else:
+                failed.append(str(path))
+                group_report["failed"].append(str(path))
+            group_report["failed_entries"].extend(path_failed_entries)
+
+        report["groups"].append(group_report)
+
+    for group_key, group_report in unsized_reports.items():
+        found_bytes_total += record_background_sizes(group_key, group_report)
+
+    if budget_mode:
+        budget_paths = {key: counted_paths[key] for key in group_reports}
+        candidates = budget_candidates(
+            budget_paths,
+            path_sizes,
+            priority=[key.strip() for key in (args.priority or "").split(",") if key.strip()],
+            per_filesystem=args.target_free is not None,
+        )
+        deficits = budget_deficits(
+            [path for paths in budget_paths.values() for path in paths], args.target_free, args.free_at_least)
+        with PROFILER.span("delete", group="budget"):
+            budget_cleaned, budget_failed, budget_summary = run_budget_cleanup(
+                candidates, deficits, group_reports, dry_run=args.dry_run, engine=engine, style=style,
+                group_keep=group_keep, journal=journal, confirm=not (args.yes or args.dry_run), accounts=accounts)
+        cleaned.extend(budget_cleaned)
+        failed.extend(budget_failed)
+        selected_groups = sum(1 for group_report in group_reports.values() if group_report["selected"])
+        report["budget"] = {
+            "mode": "free_at_least" if args.free_at_least is not None else "target_free",
+            "target_bytes": args.free_at_least if args.free_at_least is not None else args.target_free,
+            **budget_summary,
+        }
+    engine.close()
+    if journal is not None:
+        journal.finish()
+    if not (args.yes or budget_mode or args.scan_only):
+        save_size_index(size_index, args.debug, style)
+
+    run_temp = False
+    temp_days = args.temp_days
+
+    if args.no_temp or args.scan_only:
+        run_temp = False
+    elif temp_days is not None:
+        if temp_days < 0:
+            print(style.warn("[WARN] --temp-days muss >= 0 sein, Temp-Bereinigung übersprungen."))
+        else:
+            run_temp = True
+    elif args.yes or budget_mode:
+        if not args.quiet:
+            print(style.info("[INFO] Temp-Bereinigung im --yes Modus übersprungen (setze --temp-days N zum Aktivieren)."))
+    elif ask_yes_no("Do you want to clean temporary files older than N days?"):
+        value = input(
+            "Delete files older than how many days? [7]: ").strip() or "7"
+        if value.isdigit():
+            temp_days = int(value)
+            run_temp = True
+        else:
+            print(style.warn("[WARN] Ungültige Zahl, temporäre Bereinigung übersprungen."))
+
+    if run_temp and temp_days is not None:
+        with PROFILER.span("temp"):
+            temp_cleaned, temp_failed = clean_temp_older_than(
+                temp_days, platform_key, dry_run=args.dry_run, age_field=args.temp_age_field)
+        cleaned.extend(temp_cleaned)
+        failed.extend(temp_failed)
+        report["temp_cleanup"] = {
+            "executed": True,
+            "days": temp_days,
+            "cleaned": temp_cleaned,
+            "failed": temp_failed,
+        }
+    else:
+        report["temp_cleanup"]["executed"] = False
+
+    report["totals"]["cleaned"] = len(cleaned)
+    report["totals"]["failed"] = len(failed)
+    report["totals"]["found_paths"] = found_paths_total
+    report["totals"]["found_bytes"] = found_bytes_total
+    report["totals"]["groups_selected"] = selected_groups
+    if accounts is not None:
+        report["users"] = user_rollup(report["groups"], path_owners)
+    if not args.no_history:
+        import sqlite3
+
+        try:
+            with PROFILER.span("history"):
+                recorded = record_history(history_path, report, int(time.time()), args.history_days)
+            debug_log(args.debug, style, f"History: {recorded} samples -> {history_path}")
+        except (OSError, sqlite3.Error) as exc:
+            print(style.warn(f"[WARN] Verlauf konnte nicht gespeichert werden ({history_path}): {exc}"))
+    start_background_delete(report, args, stager, style)
+
+    print_summary(report, cleaned, failed, style)
+    return finalize_run(report, args, style, run_started, size_index, group_timings)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import arch_cache_cleaner  # noqa: E402
+
+SHAPES = ("wide", "deep", "tiny", "hardlinks", "symlinks")
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_count(raw: str) -> int:
+    value = raw.strip().lower()
+    multiplier = SIZE_SUFFIXES.get(value[-1:], 1)
+    if value[-1:] in SIZE_SUFFIXES:
+        value = value[:-1]
+    return int(float(value) * multiplier)
+
+
+def write_file(path: Path, rng: random.Random) -> None:
+    path.write_bytes(b"x" * rng.choice((0, 64, 512, 4096, 12288)))
+
+
+def build_tree(root: Path, shape: str, entries: int, seed: int) -> None:
+    rng = random.Random(f"{seed}-{shape}-{entries}")
+    root.mkdir(parents=True)
+
+    if shape == "wide":
+        for index in range(entries):
+            write_file(root / f"f{index:08d}", rng)
+        return
+
+    if shape == "deep":
+        depth = 64
+        current = root
+        for index in range(entries):
+            if index % depth == 0:
+                current = root / f"chain{index // depth:06d}"
+                current.mkdir()
+            elif index % 4 == 0:
+                current = current / f"d{index % depth:02d}"
+                current.mkdir()
+            else:
+                write_file(current / f"f{index:08d}", rng)
+        return
+
+    if shape == "tiny":
+        for index in range(entries):
+            bucket = root / f"{index % 256:02x}"
+            bucket.mkdir(exist_ok=True)
+            (bucket / f"f{index:08d}").write_bytes(b"x")
+        return
+
+    if shape == "hardlinks":
+        originals: list[Path] = []
+        for index in range(entries):
+            bucket = root / f"{index % 64:02x}"
+            bucket.mkdir(exist_ok=True)
+            target = bucket / f"f{index:08d}"
+            if originals and index % 2:
+                os.link(rng.choice(originals), target)
+            else:
+                write_file(target, rng)
+                originals.append(target)
+        return
+
+    if shape == "symlinks":
+        originals = []
+        for index in range(entries):
+            bucket = root / f"{index % 64:02x}"
+            bucket.mkdir(exist_ok=True)
+            target = bucket / f"f{index:08d}"
+            if originals and index % 2:
+                target.symlink_to(rng.choice(originals))
+            else:
+                write_file(target, rng)
+                originals.append(target)
+        return
+
+    raise ValueError(f"unknown shape: {shape}")
+
+
+def du_size(path: Path) -> int:
+    result = subprocess.run(["du", "-sb", str(path)], check=True, capture_output=True, text=True)
+    return int(result.stdout.split("\t", 1)[0])
+
+
+def walk_size(path: Path) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            file_path = Path(root) / name
+            try:
+                if not file_path.is_symlink():
+                    total += file_path.stat().st_size
+            except OSError:
+                pass
+    return total
+
+
+def backdate_tree(root: Path) -> None:
+    settled = time.time_ns() - 2 * arch_cache_cleaner.SIZE_INDEX_SETTLE_NS
+    for current, _dirs, _files in os.walk(root):
+        os.utime(current, ns=(settled, settled))
+
+
+def scandir_size(path: Path) -> int:
+    return arch_cache_cleaner.scan_sizes([path]).get(path, 0)
+
+
+def indexed_size(path: Path, index_path: Path) -> int:
+    index = arch_cache_cleaner.SizeIndex.load(index_path)
+    size = arch_cache_cleaner.scan_sizes([path], index=index).get(path, 0)
+    index.save()
+    return size
+
+
+def index_hits(path: Path, index_path: Path) -> int:
+    index = arch_cache_cleaner.SizeIndex.load(index_path)
+    arch_cache_cleaner.scan_sizes([path], index=index)
+    return index.hits
+
+
+def serial_delete(path: Path, dry_run: bool) -> int:
+    removed = 0
+    for entry in path.iterdir():
+        if dry_run:
+            print(f"[DRY-RUN] remove: {entry}")
+        elif entry.is_dir() and not entry.is_symlink():
+            shutil.rmtree(entry)
+        else:
+            entry.unlink()
+        removed += 1
+    return removed
+
+
+def engine_delete(path: Path, dry_run: bool, jobs: int) -> int:
+    engine = arch_cache_cleaner.DeletionEngine(jobs=jobs)
+    try:
+        return int(arch_cache_cleaner.clear_paths([path], dry_run=dry_run, engine=engine)[0][1])
+    finally:
+        engine.close()
+
+
+def temp_delete(path: Path, dry_run: bool) -> int:
+    original = arch_cache_cleaner.temp_roots
+    arch_cache_cleaner.temp_roots = lambda _platform_key: [path]
+    try:
+        cleaned, _failed = arch_cache_cleaner.clean_temp_older_than(0, "linux", dry_run=dry_run)
+        return len(cleaned)
+    finally:
+        arch_cache_cleaner.temp_roots = original
+
+
+def timed(fn: Callable[[], int]) -> tuple[float, int]:
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        value = fn()
+        return time.perf_counter() - start, value
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def run_benchmarks(args: argparse.Namespace, work_dir: Path) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    scan_strategies: dict[str, Callable[[Path], int]] = {
+        "os_walk": walk_size,
+        "scandir": scandir_size,
+    }
+    if shutil.which("du") is not None:
+        scan_strategies["du_subprocess"] = du_size
+
+    delete_strategies: dict[str, Callable[[Path, bool], int]] = {
+        "serial": serial_delete,
+        "engine": lambda path, dry_run: engine_delete(path, dry_run, args.jobs),
+        "temp_stream": temp_delete,
+    }
+
+    def record(shape: str, entries: int, operation: str, strategy: str, samples: list[tuple[float, int]]) -> None:
+        seconds = [sample[0] for sample in samples]
+        results.append({
+            "shape": shape,
+            "entries": entries,
+            "operation": operation,
+            "strategy": strategy,
+            "seconds_min": min(seconds),
+            "seconds_all": seconds,
+            "value": samples[-1][1],
+        })
+        print(f"{shape:>9} {entries:>9} {operation:>9} {strategy:>18} {min(seconds):9.4f}s", file=sys.stderr)
+
+    for entries in args.sizes:
+        for shape in args.shapes:
+            tree = work_dir / f"{shape}-{entries}"
+            build_tree(tree, shape, entries, args.seed)
+
+            for name, strategy in scan_strategies.items():
+                record(shape, entries, "scan", name, [timed(lambda: strategy(tree)) for _ in range(args.repeat)])
+
+            index_path = work_dir / f"index-{shape}-{entries}.json"
+            backdate_tree(tree)
+            timed(lambda: indexed_size(tree, index_path))
+            if not index_hits(tree, index_path):
+                raise RuntimeError(f"Größen-Index nach dem Vorlauf ohne Treffer: {tree}")
+            record(shape, entries, "scan", "scandir_index_warm",
+                   [timed(lambda: indexed_size(tree, index_path)) for _ in range(args.repeat)])
+
+            for name, strategy in delete_strategies.items():
+                record(shape, entries, "dry_run", name,
+                       [timed(lambda: strategy(tree, True)) for _ in range(args.repeat)])
+
+            for name, strategy in delete_strategies.items():
+                samples = []
+                for _ in range(args.repeat):
+                    if not tree.exists():
+                        build_tree(tree, shape, entries, args.seed)
+                    samples.append(timed(lambda: strategy(tree, False)))
+                    shutil.rmtree(tree, ignore_errors=True)
+                record(shape, entries, "delete", name, samples)
+
+            shutil.rmtree(tree, ignore_errors=True)
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks für Scan- und Lösch-Pfade mit synthetischen Cache-Bäumen")
+    parser.add_argument(
+        "--sizes",
+        default="10k",
+        help="Einträge pro Baum, kommagetrennt (z. B. 10k,100k,1m,5m)",
+    )
+    parser.add_argument(
+        "--shapes",
+        default=",".join(SHAPES),
+        help=f"Baumformen, kommagetrennt ({', '.join(SHAPES)})",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen pro Messung")
+    parser.add_argument("--seed", type=int, default=1, help="Seed für reproduzierbare Bäume")
+    parser.add_argument(
+        "--jobs", type=int, default=arch_cache_cleaner.DEFAULT_DELETE_JOBS, help="Worker für die Lösch-Engine")
+    parser.add_argument("--work-dir", default=None, help="Basisverzeichnis für die Testbäume (Standard: temp)")
+    parser.add_argument("--output", default=None, help="JSON-Ergebnis in diese Datei schreiben (Standard: stdout)")
+    args = parser.parse_args()
+
+    args.sizes = [parse_count(chunk) for chunk in args.sizes.split(",") if chunk.strip()]
+    args.shapes = [chunk.strip() for chunk in args.shapes.split(",") if chunk.strip()]
+    unknown = set(args.shapes).difference(SHAPES)
+    if unknown:
+        parser.error(f"Unbekannte Formen: {', '.join(sorted(unknown))}")
+    if args.repeat < 1:
+        parser.error("--repeat muss >= 1 sein")
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="cache-cleaner-bench-", dir=args.work_dir) as raw_dir:
+        results = run_benchmarks(args, Path(raw_dir))
+
+    payload = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "jobs": args.jobs,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    text = json.dumps(payload, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
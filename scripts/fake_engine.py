@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import argparse
+import http.server
+import json
+import os
+import socketserver
+import sys
+from typing import Any
+
+
+class UnixHTTPServer(socketserver.UnixStreamServer):
+    def get_request(self) -> tuple[Any, Any]:
+        request, _address = super().get_request()
+        return request, ("fake-engine", 0)
+
+
+class EngineHandler(http.server.BaseHTTPRequestHandler):
+    server_version = "FakeEngine/1.0"
+    build_cache = 0
+    images = 0
+
+    def send_json(self, payload: Any, status: int = 200) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == "/version":
+            self.send_json({"Platform": {"Name": "Fake Engine"}, "Version": "0.0", "ApiVersion": "1.43"})
+        elif self.path == "/system/df":
+            self.send_json({
+                "BuildCache": [{"ID": "cache0", "Size": EngineHandler.build_cache, "InUse": False}],
+                "Images": [{"Id": "sha256:dangling", "RepoTags": None, "Size": EngineHandler.images, "Containers": 0}],
+            })
+        else:
+            self.send_json({"message": f"page not found: {self.path}"}, status=404)
+
+    def do_POST(self) -> None:
+        if self.path == "/build/prune":
+            self.send_json({"CachesDeleted": ["cache0"] if EngineHandler.build_cache else [],
+                            "SpaceReclaimed": EngineHandler.build_cache})
+            EngineHandler.build_cache = 0
+        elif self.path == "/images/prune":
+            self.send_json({"ImagesDeleted": [{"Deleted": "sha256:dangling"}] if EngineHandler.images else [],
+                            "SpaceReclaimed": EngineHandler.images})
+            EngineHandler.images = 0
+        else:
+            self.send_json({"message": f"page not found: {self.path}"}, status=404)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        print(f"[fake-engine] {format % args}", file=sys.stderr)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Minimale Docker/Podman-API auf einem Unix-Socket zum Testen")
+    parser.add_argument("--socket", required=True, help="Pfad des Unix-Sockets")
+    parser.add_argument("--build-cache", type=int, default=512 * 1024 * 1024, help="Freigebbarer Build-Cache in Bytes")
+    parser.add_argument("--images", type=int, default=256 * 1024 * 1024, help="Größe der dangling Images in Bytes")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    EngineHandler.build_cache = args.build_cache
+    EngineHandler.images = args.images
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    with UnixHTTPServer(args.socket, EngineHandler) as server:
+        print(f"[fake-engine] lauscht auf {args.socket}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
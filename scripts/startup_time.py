@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def time_to_first_output(command: list[str], env: dict[str, str]) -> float:
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    assert process.stdout is not None
+    first_line = process.stdout.readline()
+    elapsed = time.perf_counter() - start
+    process.stdout.read()
+    if process.wait() != 0 or not first_line:
+        raise RuntimeError(f"Befehl fehlgeschlagen: {' '.join(command)}")
+    return elapsed
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Zeit vom Programmstart bis zur ersten Ausgabe messen")
+    parser.add_argument("--repeat", type=int, default=15, help="Messungen (nach einem Aufwärmlauf)")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fehlschlagen, wenn der Median darüber liegt")
+    parser.add_argument(
+        "--max-overhead-ms",
+        type=float,
+        default=None,
+        help="Fehlschlagen, wenn der Median mehr als so viel über dem Start des nackten Interpreters liegt",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    command = [
+        sys.executable,
+        str(ROOT / "cache_cleaner.py"),
+        "--list-groups",
+        "--config",
+        str(ROOT / "cache_paths.json"),
+        "--color",
+        "never",
+    ]
+    interpreter = [sys.executable, "-c", "print()"]
+    with tempfile.TemporaryDirectory(prefix="cache-cleaner-startup-") as cache_home:
+        env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+        env["XDG_CACHE_HOME"] = cache_home
+        cold = time_to_first_output(command, env)
+        samples: list[float] = []
+        bare: list[float] = []
+        for _ in range(max(1, args.repeat)):
+            samples.append(time_to_first_output(command, env))
+            bare.append(time_to_first_output(interpreter, env))
+
+    median_ms = statistics.median(samples) * 1000
+    bare_ms = statistics.median(bare) * 1000
+    overhead_ms = median_ms - bare_ms
+    print(f"Kalt (ohne Config-Cache): {cold * 1000:.1f} ms")
+    print(f"Warm (Median aus {len(samples)}): {median_ms:.1f} ms, min {min(samples) * 1000:.1f} ms")
+    print(f"Nackter Interpreter: {bare_ms:.1f} ms, Overhead: {overhead_ms:.1f} ms")
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"[ERROR] Startzeit {median_ms:.1f} ms überschreitet Limit {args.max_ms:.1f} ms")
+        return 1
+    if args.max_overhead_ms is not None and overhead_ms > args.max_overhead_ms:
+        print(f"[ERROR] Overhead {overhead_ms:.1f} ms überschreitet Limit {args.max_overhead_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())